@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# === bench/bench_form4_parser.py ===
+# Microbenchmark del parser de Form 4: legacy (_strip_ns + ET.fromstring +
+# búsquedas .//) frente al parser streaming (insider_trading.parse_form4).
+# Comprueba además que ambos extraen los mismos campos.
+#
+# Corpus: directorio con XMLs de Form 4 guardados. Se genera ejecutando el
+# scan con INSIDER_XML_DUMP_DIR=/ruta/corpus.
+#
+# Uso:
+#   cd /ruta/a/investx-scheduler
+#   python bench/bench_form4_parser.py /ruta/corpus [repeticiones]
+
+import sys
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+# Asegurar que el directorio raíz del proyecto está en el path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from insider_trading import _strip_ns, parse_form4
+
+
+def _legacy(xml_bytes: bytes) -> dict:
+    root = ET.fromstring(_strip_ns(xml_bytes))
+    doc = {
+        tag: root.findtext(f".//{tag}")
+        for tag in ("issuerTradingSymbol", "issuerName", "rptOwnerName",
+                    "isOfficer", "isDirector", "officerTitle")
+    }
+    doc = {k: v for k, v in doc.items() if v is not None}
+    doc["txns"] = [
+        {
+            k: v for k, v in (
+                ("code",   txn.findtext(".//transactionCode")),
+                ("shares", txn.findtext(".//transactionShares/value")),
+                ("price",  txn.findtext(".//transactionPricePerShare/value")),
+            ) if v is not None
+        }
+        for txn in root.findall(".//nonDerivativeTransaction")
+    ]
+    return doc
+
+
+def _bench(fn, corpus, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for xml_bytes in corpus:
+            fn(xml_bytes)
+    return time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        raise SystemExit("Uso: python bench/bench_form4_parser.py /ruta/corpus [repeticiones]")
+
+    corpus_dir = Path(sys.argv[1])
+    repeat     = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    corpus     = [p.read_bytes() for p in sorted(corpus_dir.glob("*.xml"))]
+    if not corpus:
+        raise SystemExit(f"Sin XMLs en {corpus_dir}")
+
+    mismatches = 0
+    for xml_bytes in corpus:
+        try:
+            if _legacy(xml_bytes) != parse_form4(xml_bytes):
+                mismatches += 1
+        except ET.ParseError:
+            mismatches += 1
+
+    n_docs  = len(corpus) * repeat
+    n_bytes = sum(len(x) for x in corpus) * repeat
+    print(f"Corpus: {len(corpus)} XMLs ({n_bytes / repeat / 1024:.0f} KB) × {repeat} repeticiones")
+    print(f"Diferencias legacy vs streaming: {mismatches}")
+
+    for label, fn in (("legacy   ", _legacy), ("streaming", parse_form4)):
+        secs = _bench(fn, corpus, repeat)
+        print(f"{label}: {secs * 1000:8.1f} ms total · "
+              f"{secs / n_docs * 1e6:7.1f} µs/doc · "
+              f"{n_bytes / secs / 1e6:6.1f} MB/s")
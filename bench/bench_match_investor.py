@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# === bench/bench_match_investor.py ===
+# Benchmark de large_investors._match_investor: bucle legacy (substring por
+# cada inversor conocido) frente al matcher compilado (regex con forma de trie).
+# Amplía _KNOWN_INVESTORS con fondos sintéticos y comprueba que ambos devuelven
+# la misma etiqueta para cada nombre.
+#
+# Uso:
+#   cd /ruta/a/investx-scheduler
+#   python bench/bench_match_investor.py [n_inversores ...]      (default: 20 500 5000)
+
+import random
+import sys
+import time
+import types
+from pathlib import Path
+
+# Asegurar que el directorio raíz del proyecto está en el path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# utils arrastra openai/telegram: no hacen falta para medir el matcher
+sys.modules.setdefault("utils", types.SimpleNamespace(call_gpt_mini=None, send_telegram_message=None))
+
+import large_investors as li
+
+N_NAMES = 20000
+
+_SYL = ("AL", "BER", "CAP", "DRA", "EN", "FOR", "GRE", "HAR", "IN", "JAS", "KEL", "LON",
+        "MOR", "NOR", "OAK", "PAR", "QUIN", "ROS", "STO", "TAL", "UL", "VAN", "WEST", "ZEN")
+_SUFFIX = ("CAPITAL", "PARTNERS", "ASSET MANAGEMENT", "ADVISORS", "HOLDINGS", "FAMILY OFFICE")
+
+
+def _fund(rnd: random.Random) -> str:
+    return "".join(rnd.choice(_SYL) for _ in range(rnd.randint(2, 4))) + " " + rnd.choice(_SUFFIX)
+
+
+def _known(n: int, seed: int = 11):
+    rnd = random.Random(seed)
+    known = dict(li._KNOWN_INVESTORS)
+    while len(known) < n:
+        name = _fund(rnd)
+        known.setdefault(name, name.title())
+    return known
+
+
+def _names(known, seed: int = 5):
+    rnd = random.Random(seed)
+    frags = list(known)
+    out = []
+    for _ in range(N_NAMES):
+        if rnd.random() < 0.2:
+            out.append(f"{rnd.choice(frags)} LP")          # inversor conocido
+        else:
+            out.append(_fund(rnd) + " LLC")                # fondo cualquiera
+    return out
+
+
+def _legacy(known):
+    def match(entity_name):
+        upper = entity_name.upper()
+        for key, label in known.items():
+            if key in upper:
+                return label
+        return None
+    return match
+
+
+def _compiled(known):
+    regex, best = li._compile_investors(known)
+    return lambda entity_name: li._match_compiled(regex, best, entity_name)
+
+
+def _bench(fn, names) -> float:
+    t0 = time.perf_counter()
+    for n in names:
+        fn(n)
+    return time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [20, 500, 5000]
+    for k in sizes:
+        known = _known(k)
+        names = _names(known)
+        t0 = time.perf_counter()
+        new = _compiled(known)
+        t_build = time.perf_counter() - t0
+        old = _legacy(known)
+        diff = sum(1 for n in names if old(n) != new(n))
+        t_old = _bench(old, names)
+        t_new = _bench(new, names)
+        print(f"inversores={k:>5} · nombres={len(names)} · distintos={diff} · "
+              f"compilar {t_build * 1000:7.1f} ms · legacy {t_old * 1000:8.1f} ms · "
+              f"compilado {t_new * 1000:6.1f} ms · x{t_old / t_new:,.1f}")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# === bench/bench_select_items.py ===
+# Benchmark de news_es.select_items: versión legacy (pertenencia en listas de
+# tuplas, O(n²)) frente a la versión por índices/cursores (O(n)).
+# Genera titulares sintéticos y comprueba que ambas seleccionan lo mismo.
+#
+# Uso:
+#   cd /ruta/a/investx-scheduler
+#   python bench/bench_select_items.py [n_items ...]      (default: 1000 10000 50000)
+
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Asegurar que el directorio raíz del proyecto está en el path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import news_es
+from news_es import classify_item, is_last_hour, select_items
+
+_WORDS = (
+    "stocks shares market investors analysts company sector week session rally slump "
+    "earnings guidance revenue merger deal stake fed cpi yields tariffs trump senate "
+    "apple nvidia tesla AAPL MSFT breaking downgrade lawsuit oil china europe"
+).split()
+
+
+def _legacy(uniq):
+    if not uniq:
+        return []
+
+    last_hour = [x for x in uniq if is_last_hour(x[2])]
+    rest = [x for x in uniq if x not in last_hour]
+
+    selected = []
+    selected += last_hour[:2]
+
+    buckets = {"macro": [], "earnings": [], "deals": [], "company": [], "politics": [], "other": []}
+    for x in rest:
+        buckets[classify_item(x[2])].append(x)
+
+    target_total = news_es.MAX_ITEMS
+    need = max(0, target_total - len(selected))
+
+    def take(bucket_name, n):
+        nonlocal selected
+        out = []
+        for it in buckets[bucket_name]:
+            if it in selected:
+                continue
+            out.append(it)
+            if len(out) >= n:
+                break
+        selected += out
+
+    if need > 0:
+        take("macro", 2)
+    if len(selected) < target_total:
+        take("earnings", 2)
+    if len(selected) < target_total:
+        take("company", 2)
+    if len(selected) < target_total:
+        take("deals", 1)
+    if len(selected) < target_total:
+        take("politics", 1)
+
+    if len(selected) < target_total:
+        pool = []
+        for k in ("macro", "earnings", "company", "deals", "politics", "other"):
+            pool += [x for x in buckets[k] if x not in selected]
+        selected += pool[: max(0, target_total - len(selected))]
+
+    return selected[:target_total]
+
+
+def _items(n: int, seed: int = 7):
+    rnd = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    items = []
+    for i in range(n):
+        title = " ".join(rnd.choice(_WORDS) for _ in range(rnd.randint(5, 12))) + f" #{i}"
+        items.append((rnd.random() * 20, now - timedelta(minutes=rnd.randint(0, 600)),
+                      title, f"https://example.com/{i}", ""))
+    items.sort(key=lambda x: (x[0], x[1]), reverse=True)
+    return items
+
+
+def _bench(fn, items, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn(items)
+    return (time.perf_counter() - t0) / repeat
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [1000, 10000, 50000]
+    for n in sizes:
+        items = _items(n)
+        for x in items:              # clasificación cacheada: medimos la selección
+            classify_item(x[2])
+        same = _legacy(items) == select_items(items)
+        t_new = _bench(select_items, items, 5)
+        t_old = _bench(_legacy, items, 1)
+        print(f"n={n:>6} · iguales={same} · legacy {t_old * 1000:9.1f} ms · "
+              f"indexada {t_new * 1000:7.2f} ms · x{t_old / t_new:,.0f}")
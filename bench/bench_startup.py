@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# === bench/bench_startup.py ===
+# Coste de arranque de main.py en un tick de cron sin nada que hacer.
+# - Lanza un intérprete limpio con `python -X importtime`, importa main y
+#   ejecuta un tick a una hora sin franjas (domingo 03:07 Madrid)
+# - Informe estilo importtime: módulos más caros (acumulado) y tiempo total
+# - Falla (exit 1) si se importa algún módulo pesado o si se supera el presupuesto
+#
+# Uso:
+#   cd /ruta/a/investx-scheduler
+#   python bench/bench_startup.py [presupuesto_ms]     (default: 300)
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+# Nada de esto debe cargarse en un tick sin jobs
+HEAVY = (
+    "pandas", "numpy", "matplotlib", "yfinance", "openai", "pandas_market_calendars",
+    "feedparser", "playwright", "jinja2", "instagrapi", "requests", "curl_cffi",
+)
+
+_TICK = """
+import sys
+from datetime import datetime
+from zoneinfo import ZoneInfo
+import main
+main._tick(datetime(2026, 1, 4, 3, 7, tzinfo=ZoneInfo("Europe/Madrid")))
+loaded = sorted({m.split(".")[0] for m in sys.modules} & set(sys.argv[1].split(",")))
+print("HEAVY_LOADED=" + ",".join(loaded))
+"""
+
+
+def _parse_importtime(stderr: str):
+    """Líneas 'import time: self | cumulative | módulo' → [(acumulado_us, módulo)]."""
+    rows = []
+    for ln in stderr.splitlines():
+        if not ln.startswith("import time:") or "cumulative" in ln:
+            continue
+        parts = ln[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            rows.append((int(parts[1]), parts[2].rstrip()))
+        except ValueError:
+            continue
+    return rows
+
+
+if __name__ == "__main__":
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 300.0
+
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _TICK, ",".join(HEAVY)],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    wall_ms = (time.perf_counter() - t0) * 1000
+
+    if proc.returncode != 0:
+        print(proc.stdout)
+        print("\n".join(ln for ln in proc.stderr.splitlines() if not ln.startswith("import time:")))
+        raise SystemExit("El tick falló.")
+
+    rows = _parse_importtime(proc.stderr)
+    print("Top 15 imports (acumulado):")
+    for cum, name in sorted(rows, reverse=True)[:15]:
+        print(f"  {cum / 1000:8.1f} ms  {name.strip()}")
+
+    main_us = next((cum for cum, name in rows if name.strip() == "main"), 0)
+    heavy = next((ln.split("=", 1)[1] for ln in proc.stdout.splitlines()
+                  if ln.startswith("HEAVY_LOADED=")), "")
+    print(f"\nimport main: {main_us / 1000:.1f} ms · proceso completo: {wall_ms:.0f} ms "
+          f"(presupuesto {budget_ms:.0f} ms)")
+    print(f"Módulos pesados cargados: {heavy or 'ninguno'}")
+
+    if heavy or wall_ms > budget_ms:
+        raise SystemExit(1)
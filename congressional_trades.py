@@ -7,7 +7,8 @@
 # Marco legal: STOCK Act (2012) → plazo de 30–45 días para declarar
 #
 # Lógica:
-#  - Filtra por disclosure_date reciente (últimos 3 días → novedades)
+#  - Filtra por disclosure_date desde el último día cubierto (scan_windows),
+#    con un solape mínimo de 3 días porque los agregadores publican tarde
 #  - Umbral mínimo configurable (CONGRESS_MIN_AMOUNT, default $50K)
 #  - Anti-dup por clave (nombre, ticker, tipo, fecha operación)
 #  - IA: detecta patrones por partido/sector/comité
@@ -16,12 +17,12 @@ from __future__ import annotations
 
 import json
 import os
-from datetime import datetime, date, timedelta
+from datetime import datetime, date
 from typing import Any, Dict, List, Optional, Tuple
 from zoneinfo import ZoneInfo
 
-import requests
-
+import http_client
+import scan_windows
 from utils import call_gpt_mini, send_telegram_message
 
 TZ         = ZoneInfo("Europe/Madrid")
@@ -272,7 +273,7 @@ def _fetch_quiverquant(disc_from: date, disc_to: date) -> Optional[List[Dict]]:
         "User-Agent":    "InvestX-Bot/1.0",
     }
     try:
-        resp = requests.get(_QUIVER_URL, headers=headers, timeout=HTTP_TIMEOUT)
+        resp = http_client.get(_QUIVER_URL, headers=headers, timeout=HTTP_TIMEOUT)
         resp.raise_for_status()
         raw = resp.json()
         items = raw if isinstance(raw, list) else raw.get("data", [])
@@ -293,7 +294,7 @@ def _fetch_json_fallback(urls: List[str], label: str):
     """Intenta cada URL en orden hasta obtener JSON válido (fuentes fallback)."""
     for url in urls:
         try:
-            resp = requests.get(url, headers=_HEADERS, timeout=HTTP_TIMEOUT)
+            resp = http_client.get(url, headers=_HEADERS, timeout=HTTP_TIMEOUT)
             resp.raise_for_status()
             if not resp.content:
                 continue
@@ -350,8 +351,11 @@ def _parse_fallback_item(item: Dict, chamber: str,
     }
 
 
-def _fetch_fallback(disc_from: date, disc_to: date) -> List[Dict]:
-    """Fuente fallback: housestockwatcher + senatestockwatcher (si resto falla)."""
+def _fetch_fallback(disc_from: date, disc_to: date) -> Optional[List[Dict]]:
+    """
+    Fuente fallback: housestockwatcher + senatestockwatcher (si resto falla).
+    None si ningún endpoint respondió.
+    """
     results = []
     any_ok = False
 
@@ -373,6 +377,7 @@ def _fetch_fallback(disc_from: date, disc_to: date) -> List[Dict]:
 
     if not any_ok:
         print("[congress] Legacy fallback: todos los endpoints sin respuesta.")
+        return None
 
     return results
 
@@ -438,7 +443,7 @@ def _fetch_fmp(disc_from: date, disc_to: date) -> Optional[List[Dict]]:
     for chamber, path in chambers:
         url = f"{_FMP_BASE}/{path}?apikey={FMP_API_KEY}&limit=300"
         try:
-            resp = requests.get(url, headers=_HEADERS, timeout=HTTP_TIMEOUT)
+            resp = http_client.get(url, headers=_HEADERS, timeout=HTTP_TIMEOUT)
             resp.raise_for_status()
             raw   = resp.json()
             items = raw if isinstance(raw, list) else (
@@ -558,7 +563,7 @@ def _fetch_capitol_trades(disc_from: date, disc_to: date) -> Optional[List[Dict]
         mode = "curl_cffi"
     except ImportError:
         def _get(url: str):
-            return requests.get(url, headers=_CAPITOL_HEADERS, timeout=HTTP_TIMEOUT)
+            return http_client.get(url, headers=_CAPITOL_HEADERS, timeout=HTTP_TIMEOUT)
         mode = "requests"
 
     all_items: List[Dict] = []
@@ -598,10 +603,11 @@ def _fetch_capitol_trades(disc_from: date, disc_to: date) -> Optional[List[Dict]
     return results
 
 
-def _fetch_all_trades(disc_from: date, disc_to: date) -> List[Dict]:
+def _fetch_all_trades(disc_from: date, disc_to: date) -> Optional[List[Dict]]:
     """
     Cadena de fuentes: QuiverQuant → FMP → Capitol Trades → fallback legacy.
-    Devuelve lista unificada de operaciones filtradas por ventana y umbral.
+    Devuelve lista unificada de operaciones filtradas por ventana y umbral
+    (vacía si no hay ninguna), o None si todas las fuentes fallaron.
     """
     # 1. QuiverQuant (paid, si está configurado)
     trades = _fetch_quiverquant(disc_from, disc_to)
@@ -624,7 +630,8 @@ def _fetch_all_trades(disc_from: date, disc_to: date) -> List[Dict]:
     # 4. Fallback histórico (housestockwatcher S3 — probablemente caído)
     print("[congress] CapitolTrades no disponible. Probando legacy fallback...")
     trades = _fetch_fallback(disc_from, disc_to)
-    print(f"[congress] Fallback: {len(trades)} ops en ventana.")
+    if trades is not None:
+        print(f"[congress] Fallback: {len(trades)} ops en ventana.")
     return trades
 
 
@@ -756,7 +763,7 @@ def run_congressional_trades(force: bool = False) -> None:
     # Marcar al inicio para evitar doble ejecución concurrente
     _mark_sent(today, [])
 
-    # Ventana de disclosure: últimos 3 días (los lunes, 5 para cubrir el fin de semana)
+    # Ventana de disclosure: planificada por scan_windows (hasta hoy incluido)
     # Override via env (útil en entornos de test con fecha de sistema incorrecta)
     _env_from = os.getenv("CONGRESS_DATE_FROM", "").strip()
     _env_to   = os.getenv("CONGRESS_DATE_TO",   "").strip()
@@ -768,15 +775,23 @@ def run_congressional_trades(force: bool = False) -> None:
         except ValueError:
             _env_from = _env_to = ""
 
-    if not (_env_from and _env_to):
-        lookback  = 5 if today.weekday() == 0 else 3
-        disc_to   = today
-        disc_from = today - timedelta(days=lookback)
+    planned = not (_env_from and _env_to)
+    if planned:
+        # Desde el último día cubierto (scan_windows); sin estado: 3 sesiones NYSE.
+        # Siempre al menos 3 días: los agregadores añaden tarde declaraciones
+        # con disclosure_date ya cubierto (el anti-dup descarta repetidas).
+        disc_from, disc_to = scan_windows.plan_window(
+            "congress", today, sessions=3, include_today=True, force=force,
+            min_lookback_days=3)
 
     print(f"[congress] Buscando declaraciones del {disc_from} al {disc_to} "
           f"(umbral ${MIN_AMOUNT:,})...")
 
     all_trades = _fetch_all_trades(disc_from, disc_to)
+    if all_trades is None:
+        # Fallo de descarga: la ventana no avanza y se reintenta en la próxima
+        print("[congress] Ninguna fuente disponible. Nada enviado.")
+        return
     print(f"[congress] {len(all_trades)} operaciones en ventana total.")
 
     # Filtrar ya enviados
@@ -788,6 +803,8 @@ def run_congressional_trades(force: bool = False) -> None:
     print(f"[congress] {len(new_trades)} operaciones nuevas.")
 
     if not new_trades:
+        if planned:
+            scan_windows.commit_window("congress", disc_to, today)
         print("[congress] Sin declaraciones nuevas. Nada enviado.")
         return
 
@@ -803,4 +820,6 @@ def run_congressional_trades(force: bool = False) -> None:
     keys = [_trade_key(t["name"], t["ticker"], t["type"], t["tx_date"].isoformat())
             for t in new_trades]
     _mark_sent(today, keys)
+    if planned:
+        scan_windows.commit_window("congress", disc_to, today)
     print(f"[congress] OK enviado {len(new_trades)} operaciones (force={force}).")
@@ -9,8 +9,7 @@ import logging
 from datetime import datetime, timedelta, date
 from typing import List, Dict, Any
 
-import requests
-
+import http_client
 from utils import send_telegram_message, call_gpt_mini
 
 logger = logging.getLogger(__name__)
@@ -78,7 +77,7 @@ def _fetch_nasdaq_calendar_day(target_date: date) -> List[Dict[str, Any]]:
     date_str = target_date.isoformat()
 
     try:
-        resp = requests.get(
+        resp = http_client.get(
             "https://api.nasdaq.com/api/calendar/earnings",
             params={"date": date_str},
             headers=_NASDAQ_HEADERS,
@@ -13,8 +13,8 @@ from datetime import datetime, timedelta, date
 from zoneinfo import ZoneInfo
 from typing import Any, Dict, List, Optional
 
-import requests
-
+import http_cache
+import http_client
 from utils import call_gpt_mini
 
 # -----------------------------
@@ -69,7 +69,7 @@ def _send_telegram(message: str) -> None:
             "disable_web_page_preview": True,
         }
         try:
-            requests.post(url, json=payload, timeout=20).raise_for_status()
+            http_client.post(url, json=payload, timeout=20).raise_for_status()
         except Exception as e:
             print(f"[econ] ERROR enviando Telegram (chunk {idx}): {e}")
 
@@ -112,9 +112,8 @@ def _fetch_ff(url: str) -> Optional[List[Dict[str, Any]]]:
         "Accept": "application/json",
     }
     try:
-        resp = requests.get(url, headers=headers, timeout=HTTP_TIMEOUT)
-        resp.raise_for_status()
-        return resp.json()
+        # Caché compartida: premarket/market_close/econ piden la misma semana
+        return http_cache.get_json(url, headers=headers, timeout=HTTP_TIMEOUT)
     except Exception as e:
         print(f"[econ] Error fetching {url}: {e}")
         return None
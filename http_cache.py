@@ -0,0 +1,160 @@
+# === http_cache.py ===
+# InvestX — Caché de descargas compartida entre informes
+# - Memoria (por ejecución) + disco (entre ejecuciones de cron) con TTL corto
+# - Clave: URL; al caducar, GET condicional (If-None-Match / If-Modified-Since)
+#   → 304 = se reutiliza el cuerpo guardado sin volver a descargarlo
+# - Lo usan premarket, market_close, econ_calendar y news_es para el JSON
+#   semanal de ForexFactory y los feeds RSS, que se piden con minutos de diferencia
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import http_client
+
+CACHE_DIR   = os.getenv("HTTP_CACHE_DIR", "http_cache")
+DEFAULT_TTL = float(os.getenv("HTTP_CACHE_TTL_MIN", "10")) * 60
+
+# url → (fetched_at, versión = ETag / Last-Modified / fetched_at, cuerpo)
+_MEM:   Dict[str, Tuple[float, str, bytes]] = {}
+# url → (versión del cuerpo parseado, objeto)
+_JSON:  Dict[str, Tuple[str, Any]] = {}
+# clave → (calculado_en, valor) para memoize()
+_MEMO:  Dict[str, Tuple[float, Any]] = {}
+_LOCK = threading.Lock()
+
+
+# ---------------------------------------------------------------------------
+# Disco: <sha1>.json (metadatos) + <sha1>.body (cuerpo)
+# ---------------------------------------------------------------------------
+def _paths(url: str) -> Tuple[str, str]:
+    h = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    return os.path.join(CACHE_DIR, h + ".json"), os.path.join(CACHE_DIR, h + ".body")
+
+
+def _load_disk(url: str) -> Tuple[Dict, Optional[bytes]]:
+    meta_path, body_path = _paths(url)
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(body_path, "rb") as f:
+            return meta, f.read()
+    except Exception:
+        return {}, None
+
+
+def _save_disk(url: str, meta: Dict, body: Optional[bytes]) -> None:
+    meta_path, body_path = _paths(url)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        if body is not None:
+            with open(body_path, "wb") as f:
+                f.write(body)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+    except Exception:
+        pass
+
+
+def _remember(url: str, fetched_at: float, etag: str, body: bytes) -> None:
+    with _LOCK:
+        _MEM[url] = (fetched_at, etag, body)
+
+
+# ---------------------------------------------------------------------------
+# API
+# ---------------------------------------------------------------------------
+def _version(meta: Dict) -> str:
+    return meta.get("etag") or meta.get("last_modified") or str(meta.get("fetched_at", ""))
+
+
+def get_versioned(url: str, headers: Optional[Dict[str, str]] = None,
+                  ttl: Optional[float] = None,
+                  timeout: Optional[float] = None) -> Tuple[str, bytes]:
+    """
+    (versión, cuerpo) de `url`: memoria → disco fresco → GET condicional.
+    La versión (ETag / Last-Modified) no cambia tras un 304, así que el
+    llamante puede saltarse el parseo si ya tiene esa versión procesada.
+    Los errores HTTP/red se propagan igual que con http_client.
+    """
+    ttl = DEFAULT_TTL if ttl is None else ttl
+    now = time.time()
+
+    with _LOCK:
+        mem = _MEM.get(url)
+    if mem and now - mem[0] < ttl:
+        return mem[1], mem[2]
+
+    meta, body = _load_disk(url)
+    if body is not None and now - float(meta.get("fetched_at") or 0) < ttl:
+        _remember(url, float(meta["fetched_at"]), _version(meta), body)
+        return _version(meta), body
+
+    req_headers = dict(headers or {})
+    if body is not None:
+        if meta.get("etag"):
+            req_headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            req_headers["If-Modified-Since"] = meta["last_modified"]
+
+    kwargs = {"headers": req_headers}
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+    resp = http_client.get(url, **kwargs)
+
+    if resp.status_code == 304 and body is not None:
+        meta["fetched_at"] = now
+        _save_disk(url, meta, None)
+        _remember(url, now, _version(meta), body)
+        return _version(meta), body
+
+    resp.raise_for_status()
+    body = resp.content
+    meta = {
+        "url":           url,
+        "etag":          resp.headers.get("ETag", ""),
+        "last_modified": resp.headers.get("Last-Modified", ""),
+        "fetched_at":    now,
+    }
+    _save_disk(url, meta, body)
+    _remember(url, now, _version(meta), body)
+    return _version(meta), body
+
+
+def get_bytes(url: str, headers: Optional[Dict[str, str]] = None,
+              ttl: Optional[float] = None, timeout: Optional[float] = None) -> bytes:
+    """Cuerpo de `url` (ver get_versioned)."""
+    return get_versioned(url, headers=headers, ttl=ttl, timeout=timeout)[1]
+
+
+def get_json(url: str, headers: Optional[Dict[str, str]] = None,
+             ttl: Optional[float] = None, timeout: Optional[float] = None) -> Any:
+    """Como get_bytes pero devuelve el JSON parseado (una vez por versión del cuerpo)."""
+    version, body = get_versioned(url, headers=headers, ttl=ttl, timeout=timeout)
+    with _LOCK:
+        cached = _JSON.get(url)
+    if cached and cached[0] == version:
+        return cached[1]
+    data = json.loads(body)
+    with _LOCK:
+        _JSON[url] = (version, data)
+    return data
+
+
+def memoize(key: str, fn: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+    """Resultado de fn() reutilizado dentro de la ejecución durante `ttl` segundos."""
+    ttl = DEFAULT_TTL if ttl is None else ttl
+    now = time.time()
+    with _LOCK:
+        hit = _MEMO.get(key)
+    if hit and now - hit[0] < ttl:
+        return hit[1]
+    value = fn()
+    with _LOCK:
+        _MEMO[key] = (now, value)
+    return value
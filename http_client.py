@@ -0,0 +1,197 @@
+# === http_client.py ===
+# InvestX — Cliente HTTP compartido por todos los módulos
+# - Una requests.Session por host: keep-alive y pool de conexiones (sin TLS por llamada)
+# - Reintentos con backoff exponencial en 429/5xx y errores de conexión (solo
+#   métodos idempotentes), por encima del token bucket: cada intento consume
+#   su token, así una ráfaga de 429 no supera el límite del host
+# - Límite de peticiones/seg (token bucket) y de concurrencia por grupo de hosts
+#   (todos los *.sec.gov comparten el límite de 10 req/s de la SEC)
+# - Métricas de latencia por host: log_metrics() al final de cada ejecución
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_TIMEOUT = float(os.getenv("HTTP_DEFAULT_TIMEOUT", "20"))
+HTTP_RETRIES    = int(os.getenv("HTTP_RETRIES", "3"))
+HTTP_BACKOFF    = float(os.getenv("HTTP_BACKOFF", "0.5"))   # 0.5s, 1s, 2s...
+POOL_SIZE       = int(os.getenv("HTTP_POOL_SIZE", "16"))
+
+# Límites por sufijo de host: rps = peticiones/seg, concurrency = en vuelo a la vez.
+# Los hosts que no encajan en ninguno van sin límite.
+HOST_LIMITS: Dict[str, Dict[str, float]] = {
+    "sec.gov":          {"rps": float(os.getenv("SEC_MAX_RPS", "10")), "concurrency": 8},
+    "yahoo.com":        {"rps": 5, "concurrency": 4},
+    "api.telegram.org": {"rps": 1, "concurrency": 1},   # ~1 msg/s por chat
+    "nasdaq.com":       {"rps": 2, "concurrency": 2},
+}
+
+
+class TokenBucket:
+    """
+    Token bucket thread-safe: se recarga a `rate` tokens/seg hasta `capacity`.
+    Cada petición consume un token; si no hay, el hilo espera lo justo.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self._rate     = max(rate, 0.1)
+        self._capacity = max(capacity, 1.0)
+        self._tokens   = self._capacity
+        self._ts       = time.monotonic()
+        self._lock     = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._ts) * self._rate)
+                self._ts = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self._rate
+            time.sleep(wait)
+
+
+_RETRY_STATUS = frozenset((429, 500, 502, 503, 504))
+_IDEMPOTENT   = frozenset(("GET", "HEAD"))
+
+_LOCK = threading.Lock()
+_SESSIONS: Dict[str, requests.Session] = {}
+_BUCKETS:  Dict[str, TokenBucket] = {}
+_SEMAPHORES: Dict[str, threading.BoundedSemaphore] = {}
+_METRICS:  Dict[str, Dict[str, float]] = {}
+
+
+def _limit_key(host: str) -> Optional[str]:
+    for suffix in HOST_LIMITS:
+        if host == suffix or host.endswith("." + suffix):
+            return suffix
+    return None
+
+
+def _new_session() -> requests.Session:
+    s = requests.Session()
+    # Sin reintentos en el adapter: los hace request() para que pasen por el bucket
+    adapter = HTTPAdapter(max_retries=0, pool_connections=4, pool_maxsize=POOL_SIZE)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+
+def session_for(url: str) -> requests.Session:
+    """Session keep-alive del host de `url` (se crea la primera vez)."""
+    host = urlparse(url).netloc.lower()
+    with _LOCK:
+        sess = _SESSIONS.get(host)
+        if sess is None:
+            sess = _SESSIONS[host] = _new_session()
+            key = _limit_key(host)
+            if key and key not in _BUCKETS:
+                _BUCKETS[key]    = TokenBucket(HOST_LIMITS[key]["rps"])
+                _SEMAPHORES[key] = threading.BoundedSemaphore(int(HOST_LIMITS[key]["concurrency"]))
+        return sess
+
+
+def _record(host: str, secs: float, ok: bool) -> None:
+    with _LOCK:
+        m = _METRICS.setdefault(host, {"n": 0, "errors": 0, "total": 0.0, "max": 0.0})
+        m["n"]     += 1
+        m["errors"] += 0 if ok else 1
+        m["total"] += secs
+        m["max"]    = max(m["max"], secs)
+
+
+def _send(sess: requests.Session, method: str, url: str, host: str,
+          key: Optional[str], **kwargs) -> requests.Response:
+    """Un intento: semáforo + token del host, petición y métricas."""
+    sem = _SEMAPHORES.get(key) if key else None
+    if sem:
+        sem.acquire()
+    try:
+        if key:
+            _BUCKETS[key].acquire()
+        t0 = time.monotonic()
+        ok = False
+        try:
+            resp = sess.request(method, url, **kwargs)
+            ok = resp.status_code < 400
+            return resp
+        finally:
+            _record(host, time.monotonic() - t0, ok)
+    finally:
+        if sem:
+            sem.release()
+
+
+def _backoff(attempt: int, resp: Optional[requests.Response]) -> float:
+    """Espera antes del reintento: Retry-After (segundos) si viene, si no exponencial."""
+    if resp is not None:
+        retry_after = (resp.headers.get("Retry-After") or "").strip()
+        if retry_after.isdigit():
+            return min(float(retry_after), 60.0)
+    return HTTP_BACKOFF * (2 ** attempt)
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    """
+    Igual que requests.request pero con session por host, reintentos,
+    límites por host y métricas. timeout por defecto: DEFAULT_TIMEOUT.
+    Los reintentos (GET/HEAD) esperan fuera del semáforo y vuelven a pedir
+    token, así que cuentan contra el límite del host como cualquier petición.
+    """
+    sess = session_for(url)
+    host = urlparse(url).netloc.lower()
+    key  = _limit_key(host)
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    retries = HTTP_RETRIES if method.upper() in _IDEMPOTENT else 0
+
+    attempt = 0
+    while True:
+        try:
+            resp = _send(sess, method, url, host, key, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt >= retries:
+                raise
+            time.sleep(_backoff(attempt, None))
+            attempt += 1
+            continue
+        if resp.status_code in _RETRY_STATUS and attempt < retries:
+            wait = _backoff(attempt, resp)
+            resp.close()
+            time.sleep(wait)
+            attempt += 1
+            continue
+        return resp
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def get_metrics() -> Dict[str, Dict[str, float]]:
+    with _LOCK:
+        return {h: dict(m) for h, m in _METRICS.items()}
+
+
+def log_metrics(reset: bool = False) -> None:
+    """Imprime peticiones, errores y latencia media/máx por host (reset: vacía tras imprimir)."""
+    with _LOCK:
+        metrics = {h: dict(m) for h, m in _METRICS.items()}
+        if reset:
+            _METRICS.clear()
+    for host, m in sorted(metrics.items(), key=lambda kv: -kv[1]["total"]):
+        print(f"[http] {host}: {int(m['n'])} req, {int(m['errors'])} err, "
+              f"media {m['total'] / m['n'] * 1000:.0f} ms, máx {m['max'] * 1000:.0f} ms, "
+              f"total {m['total']:.1f}s")
@@ -1,32 +1,41 @@
 # === insider_trading.py ===
 # InvestX — Insider Trading semanal (SEC EDGAR Form 4)
 # - Fuente: data.sec.gov (API pública, sin auth, sin bloqueo datacenter)
-# - CIKs resueltos dinámicamente desde company_tickers.json de la propia SEC
+# - CIKs resueltos dinámicamente desde company_tickers.json de la propia SEC (sec_cik_index)
 # - Solo transacciones open-market (código P=compra, S=venta)
 # - Umbral mínimo configurable via INSIDER_MIN_VALUE (default $500K)
 # - Envío semanal los lunes, anti-duplicado por semana ISO
 
 from __future__ import annotations
 
+import io
 import os
 import json
+import posixpath
 import re
+import threading
 import time
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, date
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 from zoneinfo import ZoneInfo
 
-import requests
-
+import http_client
+import scan_windows
+import sec_cik_index
 from utils import call_gpt_mini, send_telegram_message
 
+if TYPE_CHECKING:
+    import requests
+
 TZ = ZoneInfo("Europe/Madrid")
-STATE_FILE = "insider_trading_state.json"
+STATE_FILE  = "insider_trading_state.json"
+CURSOR_FILE = "insider_form4_cursor.json"   # último accession visto por CIK
 
 MIN_VALUE    = float(os.getenv("INSIDER_MIN_VALUE", "500000"))  # $500K por defecto
 HTTP_TIMEOUT = int(os.getenv("INSIDER_HTTP_TIMEOUT", "15"))
-_REQ_DELAY   = 0.12  # seg entre llamadas SEC (límite: 10 req/s)
+SCAN_WORKERS = int(os.getenv("INSIDER_WORKERS", "8"))  # hilos del scanner
 
 _SEC_HEADERS = {
     "User-Agent": "InvestX-Bot/1.0 bot@investx.io",
@@ -36,6 +45,15 @@ _SEC_HEADERS = {
 DIAS_ES  = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo"]
 MESES_ES = ["ene", "feb", "mar", "abr", "may", "jun", "jul", "ago", "sep", "oct", "nov", "dic"]
 
+
+# ---------------------------------------------------------------------------
+# Acceso a sec.gov
+# ---------------------------------------------------------------------------
+def _sec_get(url: str) -> requests.Response:
+    """GET a sec.gov vía http_client (límite SEC compartido entre módulos)."""
+    return http_client.get(url, headers=_SEC_HEADERS, timeout=HTTP_TIMEOUT)
+
+
 # ---------------------------------------------------------------------------
 # Lista de tickers a vigilar (~280 empresas, S&P 500 + growth relevantes)
 # Los CIKs se resuelven en tiempo de ejecución desde la API de la SEC.
@@ -106,27 +124,19 @@ _TICKERS = list(dict.fromkeys(_TICKERS))
 # ---------------------------------------------------------------------------
 def _build_cik_map() -> Dict[str, str]:
     """
-    Descarga company_tickers.json de la propia SEC y resuelve los CIKs
-    de todos los tickers en _TICKERS. Sin CIKs hardcodeados que puedan
-    quedar obsoletos.
+    Resuelve los CIKs de todos los tickers en _TICKERS desde el índice
+    compartido de company_tickers.json (sec_cik_index, con caché en disco).
+    Sin CIKs hardcodeados que puedan quedar obsoletos.
     """
-    url = "https://www.sec.gov/files/company_tickers.json"
-    try:
-        resp = requests.get(url, headers=_SEC_HEADERS, timeout=HTTP_TIMEOUT)
-        resp.raise_for_status()
-        data = resp.json()
-    except Exception as e:
-        print(f"[insider] Error descargando company_tickers.json: {e}")
+    if not sec_cik_index.load_index():
+        print("[insider] Error cargando company_tickers.json.")
         return {}
 
-    sec_map: Dict[str, str] = {}
-    for item in data.values():
-        ticker = (item.get("ticker") or "").strip().upper()
-        cik    = str(item.get("cik_str") or "").zfill(10)
-        if ticker:
-            sec_map[ticker] = cik
-
-    wanted = {t: sec_map[t] for t in _TICKERS if t in sec_map}
+    wanted = {}
+    for t in _TICKERS:
+        cik = sec_cik_index.ticker_to_cik(t)
+        if cik:
+            wanted[t] = cik
     print(f"[insider] CIKs resueltos: {len(wanted)}/{len(_TICKERS)} tickers")
     return wanted
 
@@ -191,7 +201,10 @@ def _safe_float(s: str) -> Optional[float]:
 
 
 def _strip_ns(xml_bytes: bytes) -> bytes:
-    """Elimina namespaces XML para simplificar el parsing con ElementTree."""
+    """
+    Elimina namespaces XML reescribiendo el documento. Solo se usa como
+    reintento cuando iterparse falla (p.ej. prefijos sin declarar).
+    """
     s = xml_bytes.decode("utf-8", errors="replace")
     s = re.sub(r'\s+xmlns[^=]*="[^"]*"', "", s)
     s = re.sub(r"<([a-zA-Z]+:)", "<", s)
@@ -199,6 +212,128 @@ def _strip_ns(xml_bytes: bytes) -> bytes:
     return s.encode("utf-8")
 
 
+# Campos de cabecera del Form 4 (se queda la primera aparición, como findtext)
+_FORM4_HEADER_TAGS = frozenset((
+    "issuerTradingSymbol", "issuerName", "rptOwnerName",
+    "isOfficer", "isDirector", "officerTitle",
+))
+
+
+def _iterparse_form4(xml_bytes: bytes) -> Dict[str, Any]:
+    """
+    Parser streaming de un Form 4 (ownershipDocument) en una sola pasada.
+    Ignora namespaces con el nombre local del tag y el comodín {*} de
+    ElementTree, y vacía cada transacción al cerrarla: no se reescribe ni
+    se copia el documento ni se recorre el árbol completo con búsquedas .//.
+
+    Devuelve {campo_cabecera: texto, ..., "txns": [{"code", "shares", "price"}]}
+    con las nonDerivativeTransaction en orden.
+    """
+    doc: Dict[str, Any] = {}
+    txns: List[Dict[str, str]] = []
+
+    for _, elem in ET.iterparse(io.BytesIO(xml_bytes), events=("end",)):
+        tag = elem.tag
+        local = tag[tag.find("}") + 1:]
+        if local == "nonDerivativeTransaction":
+            txn = {}
+            for key, path in (
+                ("code",   ".//{*}transactionCode"),
+                ("shares", ".//{*}transactionShares/{*}value"),
+                ("price",  ".//{*}transactionPricePerShare/{*}value"),
+            ):
+                text = elem.findtext(path)
+                if text is not None:
+                    txn[key] = text
+            txns.append(txn)
+            elem.clear()
+        elif local in _FORM4_HEADER_TAGS:
+            if local not in doc:
+                doc[local] = elem.text or ""
+        elif local in ("footnotes", "remarks", "derivativeTable"):
+            elem.clear()
+
+    doc["txns"] = txns
+    return doc
+
+
+def parse_form4(xml_bytes: bytes) -> Dict[str, Any]:
+    """iterparse directo; si el XML trae prefijos sin declarar, reintenta sin namespaces."""
+    try:
+        return _iterparse_form4(xml_bytes)
+    except ET.ParseError:
+        return _iterparse_form4(_strip_ns(xml_bytes))
+
+
+# ---------------------------------------------------------------------------
+# Caché de resolución de XML Form 4
+# ---------------------------------------------------------------------------
+# Guarda en disco:
+#   - strategies: agente que presenta (prefijo del accession) → estrategia que funcionó
+#   - filings:    accession → URL resuelta + transacciones parseadas
+# Reruns y force=True no vuelven a descargar XMLs ya procesados.
+XML_CACHE_FILE = "insider_form4_xml_cache.json"
+XML_CACHE_DAYS = int(os.getenv("INSIDER_XML_CACHE_DAYS", "45"))
+XML_DUMP_DIR   = os.getenv("INSIDER_XML_DUMP_DIR", "")   # guarda los XML descargados (corpus bench)
+
+_XML_STRATEGIES = ("basename", "primary", "index", "accession")
+
+_XML_CACHE: Dict[str, Dict] = {}
+_XML_CACHE_LOCK = threading.Lock()
+
+
+def _xml_cache() -> Dict[str, Dict]:
+    with _XML_CACHE_LOCK:
+        if not _XML_CACHE:
+            try:
+                with open(XML_CACHE_FILE, "r", encoding="utf-8") as f:
+                    _XML_CACHE.update(json.load(f))
+            except Exception:
+                pass
+            _XML_CACHE.setdefault("strategies", {})
+            _XML_CACHE.setdefault("filings", {})
+        return _XML_CACHE
+
+
+def _save_xml_cache() -> None:
+    cache = _xml_cache()
+    cutoff = (date.today() - timedelta(days=XML_CACHE_DAYS)).isoformat()
+    with _XML_CACHE_LOCK:
+        cache["filings"] = {
+            acc: e for acc, e in cache["filings"].items() if e.get("fd", "") >= cutoff
+        }
+        try:
+            with open(XML_CACHE_FILE, "w", encoding="utf-8") as f:
+                json.dump(cache, f, ensure_ascii=False)
+        except Exception:
+            pass
+
+
+def _candidate_urls(strategy: str, base: str, accession: str, primary_doc: str) -> List[str]:
+    # Nombre base sin prefijo de subdirectorio (e.g. "xslF345X06/form4.xml" → "form4.xml")
+    doc_basename = posixpath.basename(primary_doc) if primary_doc else ""
+
+    if strategy == "basename":
+        return [f"{base}/{doc_basename}"] if doc_basename and doc_basename != primary_doc else []
+    if strategy == "primary":
+        return [f"{base}/{primary_doc}"] if primary_doc else []
+    if strategy == "accession":
+        return [f"{base}/{accession}.xml"]
+
+    # "index": índice JSON del filing → todos los .xml de la raíz
+    urls = []
+    try:
+        r_idx = _sec_get(f"{base}/{accession}-index.json")
+        if r_idx.ok:
+            for item in r_idx.json().get("directory", {}).get("item", []):
+                name = item.get("name", "")
+                if name.lower().endswith(".xml") and "index" not in name.lower():
+                    urls.append(f"{base}/{name}")
+    except Exception:
+        pass
+    return urls
+
+
 def _fetch_xml_content(cik_int: int, accession: str, primary_doc: str) -> Optional[bytes]:
     """
     Descarga el XML de un Form 4.
@@ -207,86 +342,153 @@ def _fetch_xml_content(cik_int: int, accession: str, primary_doc: str) -> Option
     El campo primaryDocument a menudo incluye un prefijo de subdirectorio
     XSLT como "xslF345X06/form4.xml" — ese prefijo hay que eliminarlo.
 
-    Estrategias:
-      1. Nombre base del primaryDoc sin prefijo de subdirectorio (fix principal)
-      2. Nombre completo del primaryDoc tal como viene
-      3. Índice JSON del filing → buscar cualquier .xml en la raíz
-      4. {accession}.xml con guiones (nombre estándar SEC)
+    Estrategias (orden por defecto):
+      1. basename:  nombre base del primaryDoc sin prefijo de subdirectorio (fix principal)
+      2. primary:   nombre completo del primaryDoc tal como viene
+      3. index:     índice JSON del filing → buscar cualquier .xml en la raíz
+      4. accession: {accession}.xml con guiones (nombre estándar SEC)
+
+    Primero se prueba la URL ya resuelta para este accession y después la
+    estrategia aprendida para el agente que presenta (prefijo del accession);
+    la que funcione queda aprendida.
     """
-    import posixpath
     acc_clean = accession.replace("-", "")
     base = f"https://www.sec.gov/Archives/edgar/data/{cik_int}/{acc_clean}"
-
-    # Nombre base sin prefijo de subdirectorio (e.g. "xslF345X06/form4.xml" → "form4.xml")
-    doc_basename = posixpath.basename(primary_doc) if primary_doc else ""
+    agent = accession.split("-")[0]
+    cache = _xml_cache()
 
     def _try(url: str) -> Optional[bytes]:
         try:
-            r = requests.get(url, headers=_SEC_HEADERS, timeout=HTTP_TIMEOUT)
-            time.sleep(_REQ_DELAY)
+            r = _sec_get(url)
             if r.ok and b"ownershipDocument" in r.content:
                 return r.content
         except Exception:
             pass
         return None
 
-    # Estrategia 1: nombre base sin el prefijo xslF345X06/ (fix principal)
-    if doc_basename and doc_basename != primary_doc:
-        content = _try(f"{base}/{doc_basename}")
+    known_url = cache["filings"].get(accession, {}).get("url")
+    if known_url:
+        content = _try(known_url)
         if content:
             return content
 
-    # Estrategia 2: ruta completa original
-    if primary_doc:
-        content = _try(f"{base}/{primary_doc}")
-        if content:
-            return content
+    learned = cache["strategies"].get(agent)
+    order = ([learned] if learned in _XML_STRATEGIES else []) + [
+        st for st in _XML_STRATEGIES if st != learned
+    ]
+
+    for strategy in order:
+        for url in _candidate_urls(strategy, base, accession, primary_doc):
+            content = _try(url)
+            if content:
+                with _XML_CACHE_LOCK:
+                    cache["strategies"][agent] = strategy
+                    cache["filings"].setdefault(accession, {})["url"] = url
+                return content
+
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Ingesta incremental: cursor por CIK + daily index de EDGAR
+# ---------------------------------------------------------------------------
+_DAILY_INDEX_URL = "https://www.sec.gov/Archives/edgar/daily-index/{y}/QTR{q}/form.{ymd}.idx"
+
+# Cursores vistos en el scan actual; se persisten con _commit_cursors()
+# solo cuando el envío ha ido bien, para no perder filings si algo falla.
+_PENDING_CURSORS: Dict[str, Dict[str, str]] = {}
+
+# Último día de filing cubierto por el scan actual si hubo descargas fallidas
+# (None = ventana completa). El hwm no pasa de ahí: la próxima ventana vuelve
+# a incluir esos días y los cursores saltan lo que ya se parseó.
+_PENDING_COVERED: Optional[date] = None
 
-    # Estrategia 3: índice JSON del filing → todos los .xml de la raíz
+
+def _load_cursors() -> Dict[str, Dict[str, str]]:
     try:
-        idx_url = f"{base}/{accession}-index.json"
-        r_idx = requests.get(idx_url, headers=_SEC_HEADERS, timeout=HTTP_TIMEOUT)
-        time.sleep(_REQ_DELAY)
-        if r_idx.ok:
-            items = r_idx.json().get("directory", {}).get("item", [])
-            for item in items:
-                name = item.get("name", "")
-                if name.lower().endswith(".xml") and "index" not in name.lower():
-                    content = _try(f"{base}/{name}")
-                    if content:
-                        return content
+        with open(CURSOR_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def _commit_cursors() -> None:
+    if not _PENDING_CURSORS:
+        return
+    cursors = _load_cursors()
+    cursors.update(_PENDING_CURSORS)
+    try:
+        with open(CURSOR_FILE, "w", encoding="utf-8") as f:
+            json.dump(cursors, f)
     except Exception:
         pass
+    _PENDING_CURSORS.clear()
 
-    # Estrategia 4: nombre estándar SEC con guiones
-    content = _try(f"{base}/{accession}.xml")
-    if content:
-        return content
 
-    return None
+def _commit_scan(date_to: date, today: date) -> None:
+    """Persiste cursores y hwm del scan; con fallos, el hwm se queda antes del primero."""
+    _commit_cursors()
+    covered = min(date_to, _PENDING_COVERED) if _PENDING_COVERED else date_to
+    scan_windows.commit_window("insider", covered, today)
+
+
+def _ciks_with_form4(date_from: date, date_to: date) -> Optional[set]:
+    """
+    Lee el daily index de EDGAR (form.YYYYMMDD.idx) de cada día de la
+    ventana y devuelve los CIKs (int) con algún Form 4 / 4/A: el issuer
+    aparece como filer, así que el resto de CIKs se puede saltar.
+    Devuelve None si algún día laborable no está disponible → escaneo completo.
+    """
+    ciks: set = set()
+    d = date_from
+    while d <= date_to:
+        if d.weekday() < 5:
+            url = _DAILY_INDEX_URL.format(
+                y=d.year, q=(d.month - 1) // 3 + 1, ymd=d.strftime("%Y%m%d"),
+            )
+            try:
+                resp = _sec_get(url)
+                resp.raise_for_status()
+            except Exception as e:
+                print(f"[insider] Daily index {d} no disponible ({e}); escaneo completo.")
+                return None
+            for line in resp.text.splitlines():
+                parts = line.split()
+                if len(parts) >= 5 and parts[0] in ("4", "4/A") and parts[-3].isdigit():
+                    ciks.add(int(parts[-3]))
+        d += timedelta(days=1)
+    return ciks
 
 
 # ---------------------------------------------------------------------------
 # Fetch SEC EDGAR
 # ---------------------------------------------------------------------------
-def _get_form4_filings(cik: str, date_from: date, date_to: date) -> List[Dict]:
+def _get_form4_filings(
+    cik: str, date_from: date, date_to: date, cursor: Optional[Dict[str, str]] = None,
+) -> Optional[List[Dict]]:
     """
     Consulta submissions API y devuelve Form 4s cuya filingDate
     (fecha de presentación a la SEC) cae en el rango [date_from, date_to].
 
+    cursor = {"acc", "date"} del último filing ya procesado para este CIK:
+    se para al llegar a él, así solo se parsean filings más nuevos. El
+    cursor nuevo lo calcula _advance_cursor() cuando se conoce qué XML se
+    parsearon bien (los filings se devuelven del más reciente al más antiguo).
+
     Filtramos por filingDate para que cada filing aparezca exactamente
     un día: el día en que se presentó. Así no hay solapamiento entre
     ejecuciones consecutivas aunque el contenedor sea efímero.
     La fecha real de la operación (reportDate) se muestra en el mensaje.
+    Devuelve None si la descarga falla.
     """
     url = f"https://data.sec.gov/submissions/CIK{cik}.json"
     try:
-        resp = requests.get(url, headers=_SEC_HEADERS, timeout=HTTP_TIMEOUT)
+        resp = _sec_get(url)
         resp.raise_for_status()
         data = resp.json()
     except Exception as e:
         print(f"[insider] Error submissions CIK={cik}: {e}")
-        return []
+        return None
 
     recent = data.get("filings", {}).get("recent", {})
     forms  = recent.get("form", [])
@@ -295,6 +497,9 @@ def _get_form4_filings(cik: str, date_from: date, date_to: date) -> List[Dict]:
     accs   = recent.get("accessionNumber", [])
     pdocs  = recent.get("primaryDocument", [])
 
+    cur_acc  = (cursor or {}).get("acc", "")
+    cur_date = (cursor or {}).get("date", "")
+
     # La API devuelve filings en orden cronológico inverso (más reciente primero).
     filings = []
     for form, fd_str, rd_str, acc, pdoc in zip(forms, fdates, rdates, accs, pdocs):
@@ -308,6 +513,9 @@ def _get_form4_filings(cik: str, date_from: date, date_to: date) -> List[Dict]:
             break
         if fd > date_to:
             continue
+        # Ya procesado en una ejecución anterior → lo que sigue también.
+        if acc == cur_acc or (cur_date and fd_str < cur_date):
+            break
         if form not in ("4", "4/A"):
             continue
 
@@ -316,46 +524,76 @@ def _get_form4_filings(cik: str, date_from: date, date_to: date) -> List[Dict]:
     return filings
 
 
-def _parse_form4_xml(cik: str, filing: Dict) -> List[Dict]:
+def _advance_cursor(cik: str, filings: List[Dict], failed: set) -> None:
+    """
+    Deja en _PENDING_CURSORS el cursor del CIK tras el scan. `filings` va del
+    más reciente al más antiguo: sin fallos, el cursor pasa al más reciente;
+    si algún XML falló, se queda en el filing justo anterior (más antiguo) al
+    primer fallo cronológico, para que el siguiente scan lo reintente. Los
+    filings posteriores al fallo se releen de la caché de XML y el anti-dup
+    de run_daily_insider descarta las operaciones ya enviadas.
+    """
+    bad = [i for i, f in enumerate(filings) if f["accession"] in failed]
+    pos = max(bad) + 1 if bad else 0
+    if pos < len(filings):
+        f = filings[pos]
+        _PENDING_CURSORS[cik] = {"acc": f["accession"], "date": f["filing_date"].isoformat()}
+
+
+def _parse_form4_xml(cik: str, filing: Dict) -> Optional[List[Dict]]:
     """
     Descarga y parsea el XML de un Form 4.
-    Devuelve transacciones open-market (P/S) de officers/directors > umbral.
+    Devuelve transacciones open-market (P/S) de officers/directors > umbral,
+    o None si el XML no se pudo descargar o parsear.
     """
     cik_int   = int(cik)
     accession = filing["accession"]  # con guiones: "0001234567-24-000123"
 
+    # Ya parseado en una ejecución anterior → sin descarga
+    cached = _xml_cache()["filings"].get(accession, {})
+    if "txns" in cached:
+        return [dict(t, date=date.fromisoformat(t["date"])) for t in cached["txns"]]
+
     xml_content = _fetch_xml_content(cik_int, accession, filing["primary_doc"])
     if not xml_content:
         print(f"[insider]   ✗ XML no descargado: {accession} primaryDoc={filing['primary_doc']}")
-        return []
+        return None
+
+    if XML_DUMP_DIR:
+        try:
+            with open(os.path.join(XML_DUMP_DIR, f"{accession}.xml"), "wb") as f:
+                f.write(xml_content)
+        except Exception:
+            pass
 
     try:
-        root = ET.fromstring(_strip_ns(xml_content))
+        doc = parse_form4(xml_content)
     except Exception as e:
         print(f"[insider]   ✗ XML parse error {accession}: {e}")
-        return []
+        return None
 
-    issuer_ticker = (root.findtext(".//issuerTradingSymbol") or "").strip().upper()
-    issuer_name   = (root.findtext(".//issuerName") or "").strip()
-    owner_name    = (root.findtext(".//rptOwnerName") or "").strip()
-    is_officer    = root.findtext(".//isOfficer")  == "1"
-    is_director   = root.findtext(".//isDirector") == "1"
+    issuer_ticker = (doc.get("issuerTradingSymbol") or "").strip().upper()
+    issuer_name   = (doc.get("issuerName") or "").strip()
+    owner_name    = (doc.get("rptOwnerName") or "").strip()
+    is_officer    = doc.get("isOfficer")  == "1"
+    is_director   = doc.get("isDirector") == "1"
 
     if not is_officer and not is_director:
+        _cache_parsed(accession, filing, [])
         return []
 
-    role = (root.findtext(".//officerTitle") or "").strip() or (
+    role = (doc.get("officerTitle") or "").strip() or (
         "Director" if is_director else "Insider"
     )
 
     transactions = []
-    for txn in root.findall(".//nonDerivativeTransaction"):
-        code = (txn.findtext(".//transactionCode") or "").strip()
+    for txn in doc["txns"]:
+        code = (txn.get("code") or "").strip()
         if code not in ("P", "S"):
             continue
 
-        shares = _safe_float(txn.findtext(".//transactionShares/value") or "")
-        price  = _safe_float(txn.findtext(".//transactionPricePerShare/value") or "")
+        shares = _safe_float(txn.get("shares") or "")
+        price  = _safe_float(txn.get("price") or "")
         if not shares or not price:
             continue
 
@@ -372,44 +610,98 @@ def _parse_form4_xml(cik: str, filing: Dict) -> List[Dict]:
             "date":        filing["filing_date"],
         })
 
+    _cache_parsed(accession, filing, transactions)
     return transactions
 
 
+def _cache_parsed(accession: str, filing: Dict, transactions: List[Dict]) -> None:
+    cache = _xml_cache()
+    with _XML_CACHE_LOCK:
+        entry = cache["filings"].setdefault(accession, {})
+        entry["fd"]   = filing["filing_date"].isoformat()
+        entry["txns"] = [dict(t, date=t["date"].isoformat()) for t in transactions]
+
+
 # ---------------------------------------------------------------------------
 # Fetch
 # ---------------------------------------------------------------------------
-def fetch_insider_trades(date_from: date, date_to: date) -> List[Dict]:
+def fetch_insider_trades(date_from: date, date_to: date,
+                         incremental: bool = True) -> Optional[List[Dict]]:
     """
     1. Resuelve CIKs desde la SEC en tiempo real
-    2. Por cada empresa, obtiene Form 4s en el rango de fechas
-    3. Parsea XMLs y filtra por umbral de valor
+    2. Descarta CIKs sin Form 4 en el daily index de EDGAR
+    3. Por cada empresa, obtiene Form 4s en el rango de fechas
+       (incremental=True: solo los posteriores al cursor guardado del CIK)
+    4. Parsea XMLs y filtra por umbral de valor
+
+    Los pasos 3 y 4 corren en un pool de SCAN_WORKERS hilos: cada submissions
+    que llega encola sus XMLs en el mismo pool. Todas las peticiones pasan por
+    http_client, así que el ritmo real es el límite SEC y no sleeps fijos.
+
+    Si falla la descarga de un submissions o de un XML, devuelve igualmente
+    las operaciones que sí se parsearon: el cursor de ese CIK se queda antes
+    del filing fallido y _PENDING_COVERED frena el hwm, así que la próxima
+    ejecución lo reintenta. Devuelve None solo si no hay CIK map.
     """
+    global _PENDING_COVERED
+    _PENDING_CURSORS.clear()
+    _PENDING_COVERED = None
+
     cik_map = _build_cik_map()
     if not cik_map:
         print("[insider] No se pudo construir el CIK map.")
-        return []
+        return None
+
+    active = _ciks_with_form4(date_from, date_to)
+    if active is not None:
+        skipped = len(cik_map)
+        cik_map = {t: c for t, c in cik_map.items() if int(c) in active}
+        print(f"[insider] Daily index: {len(cik_map)}/{skipped} CIKs con Form 4 en la ventana")
+
+    cursors = _load_cursors() if incremental else {}
 
     all_trades: List[Dict] = []
     total = len(cik_map)
     total_filings   = 0
-    xml_ok          = 0
-    xml_fail        = 0
     below_threshold = 0
-
-    for idx, (ticker, cik) in enumerate(cik_map.items(), 1):
-        print(f"[insider] {idx}/{total} {ticker} ...", end="\r", flush=True)
-        filings = _get_form4_filings(cik, date_from, date_to)
-        time.sleep(_REQ_DELAY)
-
-        if filings:
+    failed = 0
+    retry_from: Optional[date] = None   # filingDate más antigua a reintentar
+    t0 = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=max(1, SCAN_WORKERS)) as pool:
+        sub_futures = {
+            pool.submit(_get_form4_filings, cik, date_from, date_to, cursors.get(cik)): (ticker, cik)
+            for ticker, cik in cik_map.items()
+        }
+
+        xml_futures = {}
+        by_cik: Dict[str, List[Dict]] = {}
+        failed_accs: Dict[str, set] = {}
+        for done, fut in enumerate(as_completed(sub_futures), 1):
+            ticker, cik = sub_futures[fut]
+            print(f"[insider] {done}/{total} submissions ...", end="\r", flush=True)
+            filings = fut.result()
+            if filings is None:
+                failed += 1
+                retry_from = date_from
+                continue
+            if not filings:
+                continue
             total_filings += len(filings)
-            print(f"\n[insider] {ticker}: {len(filings)} Form 4(s) en la semana")
-
-        for filing in filings:
-            txns = _parse_form4_xml(cik, filing)
-            if txns is None or txns == []:
-                # Distinguir entre XML no descargado y XML sin transacciones P/S
-                pass
+            by_cik[cik] = filings
+            print(f"\n[insider] {ticker}: {len(filings)} Form 4(s) en la ventana")
+            for filing in filings:
+                xml_futures[pool.submit(_parse_form4_xml, cik, filing)] = (cik, filing)
+
+        for fut in as_completed(xml_futures):
+            txns = fut.result()
+            if txns is None:
+                failed += 1
+                cik, filing = xml_futures[fut]
+                failed_accs.setdefault(cik, set()).add(filing["accession"])
+                fd = filing["filing_date"]
+                retry_from = fd if retry_from is None else min(retry_from, fd)
+                continue
             for t in txns:
                 if t["value"] >= MIN_VALUE:
                     all_trades.append(t)
@@ -419,10 +711,19 @@ def fetch_insider_trades(date_from: date, date_to: date) -> List[Dict]:
                 else:
                     below_threshold += 1
 
+    for cik, filings in by_cik.items():
+        _advance_cursor(cik, filings, failed_accs.get(cik, set()))
+
+    _save_xml_cache()
     print()
     print(f"[insider] RESUMEN: {total_filings} filings encontrados | "
           f"{len(all_trades)} sobre umbral | "
-          f"{below_threshold} por debajo de {_format_value(MIN_VALUE)}")
+          f"{below_threshold} por debajo de {_format_value(MIN_VALUE)} | "
+          f"{time.monotonic() - t0:.1f}s")
+
+    if failed:
+        _PENDING_COVERED = retry_from - timedelta(days=1)
+        print(f"[insider] {failed} descargas fallidas; se reintentarán desde {retry_from}.")
 
     # Compras primero, luego ventas; dentro de cada grupo por valor desc
     all_trades.sort(key=lambda x: (x["code"] != "P", -x["value"]))
@@ -687,22 +988,25 @@ def run_daily_insider(force: bool = False) -> None:
         return
 
     # Marcar AHORA como "en curso" para que si el cron vuelve a disparar
-    # mientras el scan está en marcha (el scan tarda varios minutos),
-    # la segunda ejecución vea sent_date=hoy y salga antes de empezar.
+    # mientras el scan está en marcha, la segunda ejecución vea
+    # sent_date=hoy y salga antes de empezar.
     _mark_sent(today, [])
 
-    # Ventana: filingDate = ayer exclusivamente.
-    # Los lunes ampliamos a 3 días para cubrir el viernes (sáb/dom no hay filings).
-    # Como filtramos por filingDate (no reportDate), las ventanas de días
-    # consecutivos nunca se solapan, sin necesidad de persistir estado.
-    date_to   = today - timedelta(days=1)
-    lookback  = 3 if today.weekday() == 0 else 1
-    date_from = today - timedelta(days=lookback)
+    # Ventana de filingDate hasta ayer, desde el día siguiente al último
+    # cubierto (scan_windows): tras un festivo no hay huecos ni re-escaneos.
+    # Sin estado o con force: la última sesión NYSE hasta ayer (lunes → vie–dom).
+    date_from, date_to = scan_windows.plan_window(
+        "insider", today, sessions=1, include_today=False, force=force)
 
     print(f"[insider] Buscando Form 4s con filingDate {date_from}–{date_to} "
           f"(umbral {_format_value(MIN_VALUE)})...")
 
-    all_trades = fetch_insider_trades(date_from, date_to)
+    # force=True ignora los cursores para poder reenviar la ventana completa
+    all_trades = fetch_insider_trades(date_from, date_to, incremental=not force)
+    if all_trades is None:
+        # Sin CIK map: ni cursores ni ventana avanzan; se reintenta en la próxima
+        print("[insider] Scan incompleto. Nada enviado.")
+        return
     print(f"[insider] {len(all_trades)} operaciones sobre umbral.")
 
     # Filtrar trades ya enviados en días anteriores
@@ -716,6 +1020,7 @@ def run_daily_insider(force: bool = False) -> None:
 
     if not new_trades:
         _mark_sent(today, [])
+        _commit_scan(date_to, today)
         print("[insider] Sin operaciones nuevas hoy. Nada enviado.")
         return
 
@@ -726,6 +1031,7 @@ def run_daily_insider(force: bool = False) -> None:
 
     send_telegram_message(msg)
     _mark_sent(today, [_trade_key(t) for t in new_trades])
+    _commit_scan(date_to, today)
     print(f"[insider] OK enviado (force={force}).")
 
     # Persist Instagram-ready data (used by Monday 11:00 Instagram post)
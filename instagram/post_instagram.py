@@ -13,7 +13,7 @@ import json
 import os
 import re
 
-import requests
+import http_client
 
 _HTTP_TIMEOUT = 30
 
@@ -23,7 +23,7 @@ def _upload_to_imgbb(image_path: str) -> str:
     api_key = os.environ["IMGBB_API_KEY"]
     with open(image_path, "rb") as f:
         image_b64 = base64.b64encode(f.read()).decode()
-    resp = requests.post(
+    resp = http_client.post(
         "https://api.imgbb.com/1/upload",
         data={"key": api_key, "image": image_b64},
         timeout=_HTTP_TIMEOUT,
@@ -39,7 +39,7 @@ def _post_via_make(image_path: str, caption: str) -> str:
     webhook_url = os.environ["MAKE_WEBHOOK_URL"]
     image_url   = _upload_to_imgbb(image_path)
 
-    resp = requests.post(
+    resp = http_client.post(
         webhook_url,
         json={"image_url": image_url, "caption": caption},
         timeout=_HTTP_TIMEOUT,
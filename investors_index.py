@@ -0,0 +1,230 @@
+# === investors_index.py ===
+# InvestX — Índice local de filings 13D/13G (SQLite + FTS5)
+# - Cada run_large_investors vuelca aquí los filings enriquecidos (upsert por accession)
+# - Backfill histórico por ventanas de días (large_investors.backfill_index)
+# - Consultas en milisegundos sin tocar EDGAR:
+#     "todas las posiciones de Icahn en el último año" → search("icahn", days=365)
+#     "quién ha cruzado el 5% en NVDA"                 → crossed("NVDA")
+# - Si el sqlite del sistema no trae FTS5, la búsqueda cae a LIKE sobre la tabla
+#
+# Uso:
+#   python investors_index.py backfill 2025-01-01 [2025-10-15] [--relevant]
+#   python investors_index.py search "icahn" [días]
+#   python investors_index.py crossed NVDA [pct] [días]
+
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+import sys
+import threading
+from contextlib import closing
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+DB_FILE = os.getenv("INVESTORS_INDEX_DB", "large_investors_index.sqlite3")
+
+_COLUMNS = ("accession", "form", "filed", "period", "filer_cik", "entity", "investor_label",
+            "known", "subject_cik", "ticker", "company", "pct", "shares", "indexed_at")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS filings (
+    accession      TEXT PRIMARY KEY,
+    form           TEXT,
+    filed          TEXT,
+    period         TEXT,
+    filer_cik      TEXT,
+    entity         TEXT,
+    investor_label TEXT,
+    known          INTEGER,
+    subject_cik    TEXT,
+    ticker         TEXT,
+    company        TEXT,
+    pct            REAL,
+    shares         INTEGER,
+    indexed_at     TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_filings_filed  ON filings(filed);
+CREATE INDEX IF NOT EXISTS ix_filings_ticker ON filings(ticker, filed);
+"""
+
+# Índice FTS5 "external content": el texto vive en `filings`, los triggers
+# mantienen sincronizado el índice en inserts, upserts y borrados.
+_SCHEMA_FTS = """
+CREATE VIRTUAL TABLE IF NOT EXISTS filings_fts USING fts5(
+    entity, investor_label, company, ticker,
+    content='filings', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS filings_ai AFTER INSERT ON filings BEGIN
+    INSERT INTO filings_fts(rowid, entity, investor_label, company, ticker)
+    VALUES (new.rowid, new.entity, new.investor_label, new.company, new.ticker);
+END;
+CREATE TRIGGER IF NOT EXISTS filings_ad AFTER DELETE ON filings BEGIN
+    INSERT INTO filings_fts(filings_fts, rowid, entity, investor_label, company, ticker)
+    VALUES ('delete', old.rowid, old.entity, old.investor_label, old.company, old.ticker);
+END;
+CREATE TRIGGER IF NOT EXISTS filings_au AFTER UPDATE ON filings BEGIN
+    INSERT INTO filings_fts(filings_fts, rowid, entity, investor_label, company, ticker)
+    VALUES ('delete', old.rowid, old.entity, old.investor_label, old.company, old.ticker);
+    INSERT INTO filings_fts(rowid, entity, investor_label, company, ticker)
+    VALUES (new.rowid, new.entity, new.investor_label, new.company, new.ticker);
+END;
+"""
+
+_READY: Dict[str, bool] = {}     # ruta de la BD → tiene FTS5
+_LOCK = threading.Lock()
+
+
+def _connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_FILE, timeout=30)
+    conn.row_factory = sqlite3.Row
+    with _LOCK:
+        if DB_FILE not in _READY:
+            conn.executescript(_SCHEMA)
+            try:
+                conn.executescript(_SCHEMA_FTS)
+                _READY[DB_FILE] = True
+            except sqlite3.OperationalError as e:
+                print(f"[investors-index] FTS5 no disponible ({e}); búsqueda por LIKE.")
+                _READY[DB_FILE] = False
+    return conn
+
+
+def _has_fts() -> bool:
+    return _READY.get(DB_FILE, False)
+
+
+def _clean(v) -> Optional[str]:
+    return None if v in (None, "", "?") else v
+
+
+# ---------------------------------------------------------------------------
+# Escritura
+# ---------------------------------------------------------------------------
+def upsert(filings: Iterable[Dict]) -> int:
+    """Inserta/actualiza filings enriquecidos de large_investors. Devuelve cuántos."""
+    now = datetime.now().isoformat(timespec="seconds")
+    rows = []
+    for f in filings:
+        if not f.get("accession"):
+            continue
+        rows.append((
+            f["accession"], f.get("form"), (f.get("filed") or "")[:10], (f.get("period") or "")[:10],
+            f.get("filer_cik"), f.get("entity"), f.get("investor_label"), int(bool(f.get("known"))),
+            _clean(f.get("subject_cik")), _clean(f.get("ticker")), _clean(f.get("company")),
+            f.get("pct"), f.get("shares"), now,
+        ))
+    if not rows:
+        return 0
+
+    cols = ", ".join(_COLUMNS)
+    marks = ", ".join("?" for _ in _COLUMNS)
+    updates = ", ".join(f"{c} = excluded.{c}" for c in _COLUMNS if c != "accession")
+    try:
+        with closing(_connect()) as conn, conn:
+            conn.executemany(
+                f"INSERT INTO filings ({cols}) VALUES ({marks}) "
+                f"ON CONFLICT(accession) DO UPDATE SET {updates}",
+                rows,
+            )
+    except Exception as e:
+        print(f"[investors-index] Error guardando {len(rows)} filings: {e}")
+        return 0
+    return len(rows)
+
+
+def known_accessions(accessions: Iterable[str]) -> set:
+    """Subconjunto de `accessions` que ya está en el índice (para backfill incremental)."""
+    accs = list(accessions)
+    found = set()
+    try:
+        with closing(_connect()) as conn:
+            for i in range(0, len(accs), 500):
+                chunk = accs[i:i + 500]
+                q = f"SELECT accession FROM filings WHERE accession IN ({', '.join('?' for _ in chunk)})"
+                found.update(r[0] for r in conn.execute(q, chunk))
+    except Exception as e:
+        print(f"[investors-index] Error consultando accessions: {e}")
+    return found
+
+
+# ---------------------------------------------------------------------------
+# Consultas
+# ---------------------------------------------------------------------------
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _since(days: Optional[int]) -> str:
+    return (date.today() - timedelta(days=days)).isoformat() if days else ""
+
+
+def search(text: str, days: Optional[int] = 365, limit: int = 200) -> List[Dict]:
+    """
+    Filings cuyo filer / etiqueta / empresa / ticker contienen todas las
+    palabras de `text` (prefijos: "icah" casa "ICAHN"). Más recientes primero.
+    """
+    words = _WORD_RE.findall(text)
+    if not words:
+        return []
+    since = _since(days)
+    with closing(_connect()) as conn:
+        if _has_fts():
+            match = " ".join('"' + w.replace('"', "") + '"*' for w in words)
+            q = ("SELECT f.* FROM filings_fts JOIN filings f ON f.rowid = filings_fts.rowid "
+                 "WHERE filings_fts MATCH ? AND f.filed >= ? ORDER BY f.filed DESC LIMIT ?")
+            rows = conn.execute(q, (match, since, limit)).fetchall()
+        else:
+            cond = " AND ".join(
+                "(entity LIKE ? OR investor_label LIKE ? OR company LIKE ? OR ticker LIKE ?)"
+                for _ in words
+            )
+            args: List = []
+            for w in words:
+                args += [f"%{w}%"] * 4
+            q = f"SELECT * FROM filings WHERE {cond} AND filed >= ? ORDER BY filed DESC LIMIT ?"
+            rows = conn.execute(q, (*args, since, limit)).fetchall()
+    return [dict(r) for r in rows]
+
+
+def crossed(ticker: str, pct: float = 5.0, days: Optional[int] = 365, limit: int = 200) -> List[Dict]:
+    """
+    Quién ha cruzado `pct`% en `ticker`: filings con porcentaje >= pct y, si
+    no se pudo extraer el %, los 13D/13G iniciales (los obliga cruzar el 5%).
+    Más recientes primero.
+    """
+    q = ("SELECT * FROM filings WHERE ticker = ? AND filed >= ? "
+         "AND (pct >= ? OR (pct IS NULL AND form NOT LIKE '%/A' AND ? <= 5.0)) "
+         "ORDER BY filed DESC LIMIT ?")
+    with closing(_connect()) as conn:
+        rows = conn.execute(q, (ticker.upper(), _since(days), pct, pct, limit)).fetchall()
+    return [dict(r) for r in rows]
+
+
+def _fmt_row(r: Dict) -> str:
+    pct = f"{r['pct']:.1f}%" if r.get("pct") is not None else "—"
+    return (f"{r['filed']}  {r['form'] or '':9}  {(r['investor_label'] or '')[:38]:38}  "
+            f"{r['ticker'] or '?':6}  {(r['company'] or '')[:28]:28}  {pct:>6}")
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    cmd  = args[0] if args else ""
+
+    if cmd == "backfill" and len(args) >= 2:
+        import large_investors
+        d_to = date.fromisoformat(args[2]) if len(args) > 2 else date.today()
+        large_investors.backfill_index(date.fromisoformat(args[1]), d_to,
+                                       relevant_only="--relevant" in sys.argv)
+    elif cmd == "search" and len(args) >= 2:
+        for r in search(args[1], days=int(args[2]) if len(args) > 2 else 365):
+            print(_fmt_row(r))
+    elif cmd == "crossed" and len(args) >= 2:
+        for r in crossed(args[1], pct=float(args[2]) if len(args) > 2 else 5.0,
+                         days=int(args[3]) if len(args) > 3 else 365):
+            print(_fmt_row(r))
+    else:
+        print("Uso:\n"
+              "  python investors_index.py backfill 2025-01-01 [2025-10-15] [--relevant]\n"
+              "  python investors_index.py search \"icahn\" [días]\n"
+              "  python investors_index.py crossed NVDA [pct] [días]")
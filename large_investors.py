@@ -8,27 +8,40 @@
 # Plazo legal: 10 días naturales desde el cruce del umbral del 5%.
 #
 # Estrategia:
-#  - Busca en EDGAR EFTS todos los 13D/13G de los últimos 3 días (5 lunes)
+#  - Busca en EDGAR EFTS todos los 13D/13G desde el último día cubierto
+#    (scan_windows; sin estado, las últimas 3 sesiones NYSE)
 #  - Prioriza: (a) inversores conocidos siempre, (b) cualquier SC 13D nuevo
 #  - Extrae empresa objetivo parseando la cabecera SGML del filing
 #  - Anti-dup por clave (inversor, empresa, tipo, fecha)
+#  - Cada filing enriquecido se guarda en el índice local investors_index (SQLite FTS5)
 
 from __future__ import annotations
 
 import json
 import os
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, date, timedelta
 from typing import Any, Dict, List, Optional
 from zoneinfo import ZoneInfo
 
-import requests
-
+import http_client
+import investors_index
+import scan_windows
+import sec_cik_index
+from trie_regex import trie_pattern
 from utils import call_gpt_mini, send_telegram_message
 
 TZ         = ZoneInfo("Europe/Madrid")
 STATE_FILE = "large_investors_state.json"
 HTTP_TIMEOUT = 15
+SEC_WORKERS  = int(os.getenv("INVESTORS_WORKERS", "8"))       # hilos contra SEC (el ritmo lo fija http_client)
+PARSE_WORKERS = int(os.getenv("INVESTORS_PARSE_WORKERS", "2"))  # hilos de parseo de cabeceras
+EFTS_PAGE_SIZE = 100                                          # EFTS devuelve 100 hits por página (fijo)
+EFTS_MAX_HITS  = int(os.getenv("INVESTORS_EFTS_MAX_HITS", "10000"))  # tope de paginación de EFTS
+BACKFILL_CHUNK_DAYS = int(os.getenv("INVESTORS_BACKFILL_CHUNK_DAYS", "1"))  # días por consulta EFTS en backfill
 
 DIAS_ES  = ["lun", "mar", "mié", "jue", "vie", "sáb", "dom"]
 MESES_ES = ["ene", "feb", "mar", "abr", "may", "jun",
@@ -70,13 +83,52 @@ _KNOWN_INVESTORS: Dict[str, str] = {
 }
 
 
+# ── Matcher compilado ────────────────────────────────────────────────────────
+# Una sola regex (trie de fragmentos, en lookahead para ver todas las posiciones)
+# sobre el nombre normalizado: el coste por hit EFTS depende de la longitud del
+# nombre, no del nº de inversores, así que la lista puede crecer a miles.
+# Si casan varios fragmentos gana el primero en _KNOWN_INVESTORS (como el bucle
+# original): cada fragmento guarda el mejor rango entre sus prefijos que también
+# son fragmentos, porque en cada posición la regex solo devuelve el más largo.
+_NON_ALNUM = re.compile(r"[^A-Z0-9]+")
+
+
+def _norm_name(name: str) -> str:
+    """Mayúsculas y puntuación/espacios colapsados: 'Tiger-Global  LP' → 'TIGER GLOBAL LP'."""
+    return _NON_ALNUM.sub(" ", name.upper()).strip()
+
+
+def _compile_investors(known: Dict[str, str]):
+    """(regex, fragmento normalizado → (rango, etiqueta)) para _match_investor."""
+    ranked: Dict[str, tuple] = {}
+    for rank, (frag, label) in enumerate(known.items()):
+        key = _norm_name(frag)
+        if key and key not in ranked:
+            ranked[key] = (rank, label)
+    best = {
+        key: min(ranked[key[:i]] for i in range(1, len(key) + 1) if key[:i] in ranked)
+        for key in ranked
+    }
+    regex = re.compile("(?=(" + trie_pattern(best) + "))") if best else None
+    return regex, best
+
+
+_INVESTOR_RE, _INVESTOR_BEST = _compile_investors(_KNOWN_INVESTORS)
+
+
+def _match_compiled(regex, best: Dict[str, tuple], entity_name: str) -> Optional[str]:
+    if regex is None:
+        return None
+    norm = _norm_name(entity_name)
+    first = regex.search(norm)            # la mayoría de hits EFTS no casan: salida rápida
+    if not first:
+        return None
+    return min(best[m.group(1)] for m in regex.finditer(norm, first.start()))[1]
+
+
 def _match_investor(entity_name: str) -> Optional[str]:
     """Devuelve la etiqueta del inversor si el nombre EDGAR coincide con alguno conocido."""
-    upper = entity_name.upper()
-    for key, label in _KNOWN_INVESTORS.items():
-        if key in upper:
-            return label
-    return None
+    return _match_compiled(_INVESTOR_RE, _INVESTOR_BEST, entity_name)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -118,127 +170,191 @@ def _mark_sent(d: date, new_keys: List[tuple]) -> None:
 
 
 # ─────────────────────────────────────────────────────────────────────────────
-# Caché de CIK → ticker (SEC company_tickers.json)
+# CIK → ticker / nombre (índice compartido con caché en disco)
 # ─────────────────────────────────────────────────────────────────────────────
-_CIK_TICKER_CACHE: Dict[str, str] = {}
-_CIK_NAME_CACHE:   Dict[str, str] = {}
-
 
 def _load_cik_maps() -> None:
-    global _CIK_TICKER_CACHE, _CIK_NAME_CACHE
-    if _CIK_TICKER_CACHE:
-        return
-    try:
-        r = requests.get(
-            "https://www.sec.gov/files/company_tickers.json",
-            headers=_SEC_HEADERS, timeout=20,
-        )
-        r.raise_for_status()
-        for entry in r.json().values():
-            cik = str(entry["cik_str"])
-            _CIK_TICKER_CACHE[cik] = entry["ticker"]
-            _CIK_NAME_CACHE[cik]   = entry["title"]
-    except Exception as e:
-        print(f"[investors] No se pudo cargar CIK map: {e}")
+    if not sec_cik_index.load_index():
+        print("[investors] No se pudo cargar CIK map.")
 
 
 def _cik_to_ticker(cik: str) -> Optional[str]:
-    _load_cik_maps()
-    return _CIK_TICKER_CACHE.get(cik.lstrip("0"))
+    return sec_cik_index.cik_to_ticker(cik)
 
 
 def _cik_to_name(cik: str) -> Optional[str]:
-    _load_cik_maps()
-    return _CIK_NAME_CACHE.get(cik.lstrip("0"))
+    return sec_cik_index.cik_to_name(cik)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Caché de filings parseados
+# ─────────────────────────────────────────────────────────────────────────────
+# accession → {subject_cik, pct, shares, seen}. Un accession no cambia nunca
+# (las enmiendas llevan accession propio), así que re-ejecuciones, ventanas
+# solapadas y force=True no vuelven a descargar filings ya parseados.
+FILING_CACHE_FILE = "large_investors_filing_cache.json"
+FILING_CACHE_DAYS = int(os.getenv("INVESTORS_FILING_CACHE_DAYS", "120"))
+FILING_HEAD_BYTES = 12288   # 12 KB — suficiente para cabecera + portada del form
+
+_FILING_CACHE: Dict[str, Dict] = {}
+_FILING_CACHE_LOADED = False
+_FILING_CACHE_LOCK = threading.Lock()
+
+
+def _filing_cache() -> Dict[str, Dict]:
+    global _FILING_CACHE_LOADED
+    with _FILING_CACHE_LOCK:
+        if not _FILING_CACHE_LOADED:
+            try:
+                with open(FILING_CACHE_FILE, "r", encoding="utf-8") as f:
+                    _FILING_CACHE.update(json.load(f))
+            except Exception:
+                pass
+            _FILING_CACHE_LOADED = True
+        return _FILING_CACHE
+
+
+def _save_filing_cache() -> None:
+    cache = _filing_cache()
+    cutoff = (date.today() - timedelta(days=FILING_CACHE_DAYS)).isoformat()
+    with _FILING_CACHE_LOCK:
+        for acc in [a for a, e in cache.items() if e.get("seen", "") < cutoff]:
+            del cache[acc]
+        try:
+            with open(FILING_CACHE_FILE, "w", encoding="utf-8") as f:
+                json.dump(cache, f)
+        except Exception:
+            pass
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Parseo del filing: empresa objetivo + % del capital + acciones
 # ─────────────────────────────────────────────────────────────────────────────
 
-def _parse_filing(filer_cik: str, accession: str) -> Dict:
+def _filing_url(filer_cik: str, accession: str) -> str:
+    acc_clean = accession.replace("-", "")
+    cik_clean = filer_cik.lstrip("0")
+    return (f"https://www.sec.gov/Archives/edgar/data/"
+            f"{cik_clean}/{acc_clean}/{accession}.txt")
+
+
+def _fetch_head(url: str, limit: int = FILING_HEAD_BYTES) -> bytes:
     """
-    Descarga los primeros 12 KB del filing .txt y extrae:
+    Primeros `limit` bytes de `url` con una petición Range (bytes=0-limit-1).
+    Sin compresión, para que el rango sean bytes reales del documento. Si el
+    servidor ignora el Range (200), se corta la lectura al llenar el buffer y
+    se cierra la conexión sin drenar el resto. Buffer preasignado: copia lineal.
+    """
+    headers = dict(_SEC_HEADERS)
+    headers["Accept-Encoding"] = "identity"
+    headers["Range"] = f"bytes=0-{limit - 1}"
+
+    buf  = bytearray(limit)
+    view = memoryview(buf)
+    pos  = 0
+    resp = http_client.get(url, headers=headers, stream=True, timeout=12)
+    try:
+        resp.raise_for_status()
+        for chunk in resp.iter_content(8192):
+            n = min(len(chunk), limit - pos)
+            view[pos:pos + n] = chunk[:n]
+            pos += n
+            if pos >= limit:
+                break
+    finally:
+        resp.close()
+    return bytes(view[:pos])
+
+
+_EMPTY_FILING = {"subject_cik": None, "pct": None, "shares": None}
+
+
+def _parse_filing_text(text: str) -> Dict:
+    """
+    Extrae de los primeros 12 KB del filing .txt (etapa de parseo del
+    pipeline de _enrich_with_subject):
       - CIK de la empresa objetivo (SUBJECT-COMPANY, cabecera SGML)
       - Porcentaje del capital (Item 11 del formulario 13D/13G)
       - Número de acciones (Item 9)
     Devuelve dict con claves: subject_cik, pct, shares (None si no se encuentran).
     """
-    acc_clean = accession.replace("-", "")
-    cik_clean = filer_cik.lstrip("0")
-    url = (f"https://www.sec.gov/Archives/edgar/data/"
-           f"{cik_clean}/{acc_clean}/{accession}.txt")
-    result: Dict = {"subject_cik": None, "pct": None, "shares": None}
-    try:
-        resp = requests.get(url, headers=_SEC_HEADERS, stream=True, timeout=12)
-        raw = b""
-        for chunk in resp.iter_content(1024):
-            raw += chunk
-            if len(raw) >= 12288:   # 12 KB — suficiente para cabecera + portada del form
-                break
-        text = raw.decode("utf-8", errors="replace")
+    result: Dict = dict(_EMPTY_FILING)
 
-        # ── 1) CIK de la empresa objetivo (cabecera SGML) ────────────────────
-        m = re.search(
-            r"<SUBJECT-COMPANY>.*?<CIK>\s*(\d+)\s*</CIK>",
-            text, re.DOTALL | re.IGNORECASE,
+    # ── 1) CIK de la empresa objetivo (cabecera SGML) ────────────────────────
+    m = re.search(
+        r"<SUBJECT-COMPANY>.*?<CIK>\s*(\d+)\s*</CIK>",
+        text, re.DOTALL | re.IGNORECASE,
+    )
+    if m:
+        result["subject_cik"] = m.group(1).lstrip("0") or m.group(1)
+    else:
+        # Formato antiguo (sin XML tags)
+        m2 = re.search(
+            r"SUBJECT COMPANY[\s\S]{0,200}?CENTRAL INDEX KEY[:\s]+(\d+)",
+            text, re.IGNORECASE,
         )
-        if m:
-            result["subject_cik"] = m.group(1).lstrip("0") or m.group(1)
-        else:
-            # Formato antiguo (sin XML tags)
-            m2 = re.search(
-                r"SUBJECT COMPANY[\s\S]{0,200}?CENTRAL INDEX KEY[:\s]+(\d+)",
-                text, re.IGNORECASE,
-            )
-            if m2:
-                result["subject_cik"] = m2.group(1).lstrip("0") or m2.group(1)
-
-        # ── 2) Porcentaje del capital (Item 11 / Row 11) ─────────────────────
-        pct_patterns = [
-            # Formato tabla: "11." seguido de % en la misma línea o la siguiente
-            r'(?:^|\n)\s*11[\.\)]\s*[\s\S]{0,80}?(\d{1,3}\.?\d{0,3})\s*%',
-            # Texto libre: "percent of class ... X%"
-            r'percent\s+of\s+class[^%\n]{0,80}?(\d{1,3}\.?\d{0,3})\s*%',
-        ]
-        for pat in pct_patterns:
-            mp = re.search(pat, text, re.IGNORECASE | re.MULTILINE)
-            if mp:
-                try:
-                    pct = float(mp.group(1))
-                    if 0 < pct <= 100:
-                        result["pct"] = pct
-                        break
-                except ValueError:
-                    pass
-
-        # ── 3) Número de acciones (Item 9 / Row 9) ───────────────────────────
-        shares_patterns = [
-            r'(?:^|\n)\s*9[\.\)]\s*[\s\S]{0,80}?([\d,]+)\s*(?:shares|acciones)',
-            r'aggregate\s+amount[^0-9\n]{0,60}?([\d,]+)',
-        ]
-        for pat in shares_patterns:
-            ms = re.search(pat, text, re.IGNORECASE | re.MULTILINE)
-            if ms:
-                try:
-                    result["shares"] = int(ms.group(1).replace(",", ""))
+        if m2:
+            result["subject_cik"] = m2.group(1).lstrip("0") or m2.group(1)
+
+    # ── 2) Porcentaje del capital (Item 11 / Row 11) ─────────────────────────
+    pct_patterns = [
+        # Formato tabla: "11." seguido de % en la misma línea o la siguiente
+        r'(?:^|\n)\s*11[\.\)]\s*[\s\S]{0,80}?(\d{1,3}\.?\d{0,3})\s*%',
+        # Texto libre: "percent of class ... X%"
+        r'percent\s+of\s+class[^%\n]{0,80}?(\d{1,3}\.?\d{0,3})\s*%',
+    ]
+    for pat in pct_patterns:
+        mp = re.search(pat, text, re.IGNORECASE | re.MULTILINE)
+        if mp:
+            try:
+                pct = float(mp.group(1))
+                if 0 < pct <= 100:
+                    result["pct"] = pct
                     break
-                except ValueError:
-                    pass
+            except ValueError:
+                pass
+
+    # ── 3) Número de acciones (Item 9 / Row 9) ───────────────────────────────
+    shares_patterns = [
+        r'(?:^|\n)\s*9[\.\)]\s*[\s\S]{0,80}?([\d,]+)\s*(?:shares|acciones)',
+        r'aggregate\s+amount[^0-9\n]{0,60}?([\d,]+)',
+    ]
+    for pat in shares_patterns:
+        ms = re.search(pat, text, re.IGNORECASE | re.MULTILINE)
+        if ms:
+            try:
+                result["shares"] = int(ms.group(1).replace(",", ""))
+                break
+            except ValueError:
+                pass
 
-    except Exception as e:
-        print(f"[investors] Error parseando {accession}: {e}")
     return result
 
 
+def _cached_filing(accession: str) -> Optional[Dict]:
+    cache = _filing_cache()
+    with _FILING_CACHE_LOCK:
+        hit = cache.get(accession)
+        if not hit:
+            return None
+        hit["seen"] = date.today().isoformat()
+        return {k: hit.get(k) for k in _EMPTY_FILING}
+
+
+def _store_filing(accession: str, result: Dict) -> None:
+    # Solo se cachean descargas correctas: un error de red se reintenta otro día
+    cache = _filing_cache()
+    with _FILING_CACHE_LOCK:
+        cache[accession] = dict(result, seen=date.today().isoformat())
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Búsqueda EDGAR EFTS
 # ─────────────────────────────────────────────────────────────────────────────
 
-def _search_filings(date_from: date, date_to: date) -> List[Dict]:
+def _efts_url(date_from: date, date_to: date, offset: int = 0) -> str:
     """
-    Busca en EDGAR EFTS todos los 13D/13G presentados en el rango de fechas.
-    Filtra: (a) inversores conocidos en cualquier tipo, (b) SC 13D nuevos de cualquier inversor.
+    URL de búsqueda EFTS para una página (offset = índice del primer hit).
 
     IMPORTANTE: requests urlencodea las comas en el param 'forms', convirtiéndolas
     en %2C. EDGAR EFTS espera comas literales como separador. Por eso construimos
@@ -255,58 +371,198 @@ def _search_filings(date_from: date, date_to: date) -> List[Dict]:
         f"&enddt={date_to.isoformat()}"
         f"&hits.hits.total=true"    # pedir total de resultados en respuesta
     )
+    if offset:
+        url += f"&from={offset}"
+    return url
+
+
+def _efts_page(url: str) -> Dict:
+    resp = http_client.get(url, headers=_SEC_HEADERS, timeout=HTTP_TIMEOUT)
+    resp.raise_for_status()
+    return resp.json().get("hits", {})
+
+
+def _efts_total(hits: Dict) -> int:
+    """hits.total llega como int o como {"value": N, "relation": "eq"|"gte"}."""
+    total = hits.get("total", 0)
+    if isinstance(total, dict):
+        total = total.get("value", 0)
+    try:
+        return int(total)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _filter_hit(hit: Dict, relevant_only: bool = True) -> Optional[Dict]:
+    """Filing relevante a partir de un hit EFTS, o None si no interesa (relevant_only=False: todos)."""
+    src = hit.get("_source", {})
+    entity  = src.get("entity_name", "")
+    form    = src.get("form_type", "")
+    filed   = src.get("file_date", "")
+    period  = src.get("period_of_report", "")
+    # accession number con guiones (el _id puede llevar ":documento" detrás)
+    acc     = src.get("adsh") or hit.get("_id", "").split(":")[0]
+
+    investor_label = _match_investor(entity)
+    is_new_13d     = form in ("SC 13D",)   # nueva posición activista
+
+    if relevant_only and not investor_label and not is_new_13d:
+        return None                         # no es relevante
+
+    # CIK del filer = primera parte del accession number
+    filer_cik = acc.split("-")[0].lstrip("0") if acc else ""
+
+    return {
+        "entity":         entity,
+        "investor_label": investor_label or entity,
+        "form":           form,
+        "filed":          filed,
+        "period":         period,
+        "accession":      acc,
+        "filer_cik":      filer_cik,
+        "known":          bool(investor_label),
+    }
+
+
+def _search_filings(date_from: date, date_to: date,
+                    relevant_only: bool = True) -> Optional[List[Dict]]:
+    """
+    Busca en EDGAR EFTS todos los 13D/13G presentados en el rango de fechas.
+    Filtra: (a) inversores conocidos en cualquier tipo, (b) SC 13D nuevos de cualquier inversor.
+    relevant_only=False (backfill del índice) devuelve todos sin filtrar.
+
+    Paginado: la primera página trae `total`; el resto de páginas se piden en
+    paralelo (SEC_WORKERS hilos, límite SEC en http_client) y sus hits pasan
+    por el filtro según llegan. Resultado en el orden de EFTS, sin duplicados
+    por accession.
+    Devuelve None si EFTS falla (primera página o cualquier otra): la ventana
+    quedó incompleta y el llamante no debe darla por cubierta.
+    """
+    url = _efts_url(date_from, date_to)
     print(f"[investors] EFTS URL: {url}")
+    t0 = time.monotonic()
     try:
-        resp = requests.get(url, headers=_SEC_HEADERS, timeout=15)
-        resp.raise_for_status()
-        data = resp.json()
+        first = _efts_page(url)
     except Exception as e:
         print(f"[investors] Error EFTS: {e}")
-        return []
-
-    total = data.get("hits", {}).get("total", {})
-    hits  = data.get("hits", {}).get("hits", [])
-    print(f"[investors] EFTS: {len(hits)} filings (total={total}) en {date_from}–{date_to}")
-
-    results = []
-    for hit in hits:
-        src = hit.get("_source", {})
-        entity  = src.get("entity_name", "")
-        form    = src.get("form_type", "")
-        filed   = src.get("file_date", "")
-        period  = src.get("period_of_report", "")
-        acc     = hit.get("_id", "")           # accession number con guiones
-
-        investor_label = _match_investor(entity)
-        is_new_13d     = form in ("SC 13D",)   # nueva posición activista
-
-        if not investor_label and not is_new_13d:
-            continue                            # no es relevante
-
-        # CIK del filer = primera parte del accession number
-        filer_cik = acc.split("-")[0].lstrip("0") if acc else ""
-
-        results.append({
-            "entity":         entity,
-            "investor_label": investor_label or entity,
-            "form":           form,
-            "filed":          filed,
-            "period":         period,
-            "accession":      acc,
-            "filer_cik":      filer_cik,
-            "known":          bool(investor_label),
-        })
-    return results
+        return None
+
+    total = _efts_total(first)
+    if total > EFTS_MAX_HITS:
+        print(f"[investors] EFTS: {total} hits, solo se leen {EFTS_MAX_HITS} (acota la ventana).")
+        total = EFTS_MAX_HITS
+    hits  = first.get("hits", [])
+    page_size = max(len(hits), EFTS_PAGE_SIZE)
+    offsets = list(range(len(hits), total, page_size)) if hits else []
+
+    # (offset de página, posición en la página) → filing, para conservar el orden
+    found: Dict[tuple, Dict] = {}
+    n_hits = 0
+
+    def _consume(offset: int, page_hits: List[Dict]) -> None:
+        nonlocal n_hits
+        n_hits += len(page_hits)
+        for i, hit in enumerate(page_hits):
+            f = _filter_hit(hit, relevant_only)
+            if f:
+                found[(offset, i)] = f
+
+    _consume(0, hits)
+    failed = 0
+    if offsets:
+        with ThreadPoolExecutor(max_workers=max(1, min(SEC_WORKERS, len(offsets)))) as pool:
+            futs = {pool.submit(_efts_page, _efts_url(date_from, date_to, off)): off
+                    for off in offsets}
+            for fut in as_completed(futs):
+                try:
+                    _consume(futs[fut], fut.result().get("hits", []))
+                except Exception as e:
+                    failed += 1
+                    print(f"[investors] Error EFTS página from={futs[fut]}: {e}")
+
+    results: List[Dict] = []
+    seen = set()
+    for key in sorted(found):
+        f = found[key]
+        if f["accession"] in seen:
+            continue
+        seen.add(f["accession"])
+        results.append(f)
+
+    print(f"[investors] EFTS: {n_hits}/{total} hits en {1 + len(offsets)} páginas"
+          f"{f' ({failed} fallidas)' if failed else ''} · {len(results)} relevantes · "
+          f"{date_from}–{date_to} · {time.monotonic() - t0:.1f}s")
+    return None if failed else results
+
+
+def _timed(fn, *args):
+    t0 = time.monotonic()
+    return fn(*args), time.monotonic() - t0
+
+
+def _stage_stats(name: str, secs: List[float]) -> str:
+    if not secs:
+        return f"{name} —"
+    return (f"{name} {len(secs)} · media {sum(secs) / len(secs) * 1000:.0f} ms · "
+            f"máx {max(secs) * 1000:.0f} ms")
 
 
 def _enrich_with_subject(filings: List[Dict]) -> List[Dict]:
-    """Añade ticker, nombre, % del capital y acciones a cada filing."""
-    import time
+    """
+    Añade ticker, nombre, % del capital y acciones a cada filing.
+
+    Pipeline productor/consumidor en dos pools:
+      - descarga: SEC_WORKERS hilos; el ritmo lo marca el límite SEC de
+        http_client (token bucket compartido), sin sleeps fijos
+      - parseo:   PARSE_WORKERS hilos que reciben cada cabecera en cuanto llega,
+        así las regex no bloquean a la red
+    Los filings ya parseados salen de la caché sin petición. Se conserva el
+    orden de entrada y se informa de la latencia de cada etapa.
+    """
     _load_cik_maps()
+    t0 = time.monotonic()
+    infos: List[Optional[Dict]] = [_cached_filing(f["accession"]) for f in filings]
+    pending = [i for i, info in enumerate(infos) if info is None]
+    t_download: List[float] = []
+    t_parse:    List[float] = []
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=max(1, min(SEC_WORKERS, len(pending)))) as dl_pool, \
+             ThreadPoolExecutor(max_workers=max(1, PARSE_WORKERS)) as parse_pool:
+            downloads = {
+                dl_pool.submit(_timed, _fetch_head,
+                               _filing_url(filings[i]["filer_cik"], filings[i]["accession"])): i
+                for i in pending
+            }
+            parses = {}
+            for fut in as_completed(downloads):
+                i = downloads[fut]
+                try:
+                    raw, secs = fut.result()
+                except Exception as e:
+                    print(f"[investors] Error descargando {filings[i]['accession']}: {e}")
+                    infos[i] = dict(_EMPTY_FILING)
+                    continue
+                t_download.append(secs)
+                text = raw.decode("utf-8", errors="replace")
+                parses[parse_pool.submit(_timed, _parse_filing_text, text)] = i
+
+            for fut in as_completed(parses):
+                i = parses[fut]
+                try:
+                    result, secs = fut.result()
+                except Exception as e:
+                    print(f"[investors] Error parseando {filings[i]['accession']}: {e}")
+                    infos[i] = dict(_EMPTY_FILING)
+                    continue
+                t_parse.append(secs)
+                _store_filing(filings[i]["accession"], result)
+                infos[i] = result
+
     enriched = []
-    for f in filings:
-        info = _parse_filing(f["filer_cik"], f["accession"])
+    for f, info in zip(filings, infos):
         cik  = info["subject_cik"]
+        f["subject_cik"] = cik
         if cik:
             f["ticker"]  = _cik_to_ticker(cik) or "?"
             f["company"] = _cik_to_name(cik)   or cik
@@ -316,7 +572,11 @@ def _enrich_with_subject(filings: List[Dict]) -> List[Dict]:
         f["pct"]    = info["pct"]     # float o None
         f["shares"] = info["shares"]  # int o None
         enriched.append(f)
-        time.sleep(0.12)   # respeta límite SEC 10 req/s
+    _save_filing_cache()
+
+    print(f"[investors] Enriquecidos {len(enriched)} filings "
+          f"({len(filings) - len(pending)} de caché) en {time.monotonic() - t0:.1f}s · "
+          f"{_stage_stats('descarga', t_download)} · {_stage_stats('parseo', t_parse)}")
     return enriched
 
 
@@ -460,6 +720,36 @@ def _ai_interpretation(filings: List[Dict], date_from: date, date_to: date) -> s
         return ""
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Backfill del índice local (investors_index)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def backfill_index(date_from: date, date_to: date, relevant_only: bool = False) -> int:
+    """
+    Rellena investors_index con los 13D/13G presentados entre date_from y
+    date_to, en ventanas de BACKFILL_CHUNK_DAYS días (EFTS no pagina más allá
+    de 10k hits). Incremental: los accession ya indexados no se vuelven a
+    enriquecer. No envía nada ni toca el anti-dup ni scan_windows.
+    """
+    total = 0
+    day = date_from
+    while day <= date_to:
+        end = min(date_to, day + timedelta(days=max(1, BACKFILL_CHUNK_DAYS) - 1))
+        found = _search_filings(day, end, relevant_only=relevant_only)
+        if found is None:
+            print(f"[investors] Backfill {day}–{end}: EFTS no disponible; se omite (reejecutar el rango).")
+            day = end + timedelta(days=1)
+            continue
+        done  = investors_index.known_accessions(f["accession"] for f in found)
+        todo  = [f for f in found if f["accession"] not in done]
+        if todo:
+            total += investors_index.upsert(_enrich_with_subject(todo))
+        print(f"[investors] Backfill {day}–{end}: {len(found)} filings, {len(todo)} nuevos en el índice.")
+        day = end + timedelta(days=1)
+    print(f"[investors] Backfill terminado: {total} filings indexados ({date_from}–{date_to}).")
+    return total
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Entrypoint público
 # ─────────────────────────────────────────────────────────────────────────────
@@ -486,21 +776,29 @@ def run_large_investors(force: bool = False) -> None:
         except ValueError:
             _env_from = _env_to = ""
 
-    if not (_env_from and _env_to):
-        lookback  = 5 if today.weekday() == 0 else 3
-        date_to   = today
-        date_from = today - timedelta(days=lookback)
+    planned = not (_env_from and _env_to)
+    if planned:
+        # Desde el último día cubierto (scan_windows); sin estado: 3 sesiones NYSE
+        date_from, date_to = scan_windows.plan_window(
+            "investors", today, sessions=3, include_today=True, force=force)
 
     print(f"[investors] Buscando 13D/13G del {date_from} al {date_to}...")
 
     raw_filings = _search_filings(date_from, date_to)
+    if raw_filings is None:
+        # Fallo de descarga: la ventana no avanza y se reintenta en la próxima
+        print("[investors] Búsqueda EFTS incompleta. Nada enviado.")
+        return
     print(f"[investors] {len(raw_filings)} filings relevantes antes de enriquecer.")
 
     if not raw_filings:
+        if planned:
+            scan_windows.commit_window("investors", date_to, today)
         print("[investors] Sin filings relevantes. Nada enviado.")
         return
 
     filings = _enrich_with_subject(raw_filings)
+    investors_index.upsert(filings)
 
     # Filtrar ya enviados
     sent_keys = _get_sent_keys()
@@ -508,6 +806,8 @@ def run_large_investors(force: bool = False) -> None:
     print(f"[investors] {len(new_filings)} filings nuevos (no enviados antes).")
 
     if not new_filings:
+        if planned:
+            scan_windows.commit_window("investors", date_to, today)
         print("[investors] Todo ya enviado. Nada enviado.")
         return
 
@@ -518,4 +818,6 @@ def run_large_investors(force: bool = False) -> None:
 
     send_telegram_message(msg)
     _mark_sent(today, [_trade_key(f) for f in new_filings])
+    if planned:
+        scan_windows.commit_window("investors", date_to, today)
     print(f"[investors] OK enviado {len(new_filings)} filings (force={force}).")
@@ -11,23 +11,25 @@
 # - En festivos USA (NYSE cerrado) aunque sea L-V:
 #   -> NO enviar: Premarket, Calendario económico, Market Close
 #   -> SÍ enviar: Noticias y Earnings (sin cambios)
+#
+# Modos:
+# - cron (por defecto): una pasada por minuto, evalúa la tabla JOBS
+# - daemon (python main.py --daemon): proceso residente con próximo disparo
+#   por job, locks por job y FORCE_* al arrancar
 
 import os
+import sys
 import json
+import importlib
+import signal
+import threading
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
-from us_market_calendar import is_nyse_trading_day
-
-from premarket import run_premarket_morning
-from econ_calendar import run_econ_calendar
-from news_es import run_news_once
-from earnings_weekly import run_weekly_earnings
-from market_close import run_market_close
-from insider_trading import run_daily_insider
-from congressional_trades import run_congressional_trades
-from large_investors import run_large_investors
-from instagram.run_instagram_insider import run_instagram_insider
+# Los módulos de los jobs (pandas, yfinance, matplotlib, openai, playwright...)
+# NO se importan aquí: se cargan solo cuando su franja dispara (_lazy). Un tick
+# de cron sin nada que hacer termina sin pagar esos imports.
+# Guardia de regresión: python bench/bench_startup.py
 
 
 # ---------------------------
@@ -96,149 +98,273 @@ def _mark_earnings_sent(dt_local: datetime):
     _save_earnings_state(st)
 
 
-def main():
+# ======================================================
+# TABLA DE JOBS
+# Cada job: días (0=lunes), franjas (hora, minuto) Madrid, si exige NYSE
+# abierto, ventana ("exact" = ese minuto, "hour" = desde ese minuto hasta
+# fin de la hora), flag de forzado y runner(force).
+# El orden de la tabla es el orden de ejecución en modo cron.
+# Modo daemon: un disparo por franja; si el runner lanza excepción en una
+# ventana "hour" se reintenta cada SCHEDULER_RETRY_MIN minutos hasta el fin
+# de la hora. Ojo: la mayoría de runners capturan sus propios errores y
+# retornan sin lanzar, así que solo se reintentan los que sí lanzan; no
+# equivale al cron, que volvía a dispararlos en cada tick de la ventana.
+# ======================================================
+WEEKDAYS = (0, 1, 2, 3, 4)
+
+
+def _lazy(module: str, func: str):
+    """Runner que importa el módulo del job en el primer disparo (luego queda en sys.modules)."""
+    def _run(force: bool, **kwargs):
+        return getattr(importlib.import_module(module), func)(force=force, **kwargs)
+    return _run
+
+
+run_premarket_morning    = _lazy("premarket", "run_premarket_morning")
+run_econ_calendar        = _lazy("econ_calendar", "run_econ_calendar")
+run_news_once            = _lazy("news_es", "run_news_once")
+run_weekly_earnings      = _lazy("earnings_weekly", "run_weekly_earnings")
+run_market_close         = _lazy("market_close", "run_market_close")
+run_daily_insider        = _lazy("insider_trading", "run_daily_insider")
+run_congressional_trades = _lazy("congressional_trades", "run_congressional_trades")
+run_large_investors      = _lazy("large_investors", "run_large_investors")
+run_instagram_insider    = _lazy("instagram.run_instagram_insider", "run_instagram_insider")
+
+
+def _run_earnings(force: bool):
+    if force:
+        run_weekly_earnings(force=True)
+        return
     now = datetime.now(ZoneInfo("Europe/Madrid"))
-    print(f"{now} | INFO | __main__: Ejecutando main.py...")
+    if not _earnings_already_sent_this_week(now):
+        run_weekly_earnings(force=False)
+        _mark_earnings_sent(now)
+
 
-    hour = now.hour
-    minute = now.minute
-    weekday = now.weekday()  # 0=lunes, 6=domingo
+def _run_econ(force: bool):
+    if ECON_FORCE_TOMORROW:
+        print("INFO | __main__: ECON_FORCE_TOMORROW=1 -> enviando calendario de mañana.")
+        run_econ_calendar(force=True, force_tomorrow=True)
+    else:
+        run_econ_calendar(force=force)
 
+
+def _run_instagram(force: bool):
+    # Tolerant to failure: any exception is caught so the bot continues.
     try:
-        nyse_open_today = is_nyse_trading_day(now)
+        run_instagram_insider(force=force)
     except Exception as e:
-        print(f"WARNING | __main__: Fallo al evaluar calendario NYSE ({e}). Continuando sin filtro.")
-        nyse_open_today = True
+        print(f"WARNING | __main__: Instagram falló{' (force)' if force else ''}: {e}")
 
-    INSIDER_HOUR   = 10
-    INSIDER_MINUTE = 15
 
-    CONGRESS_HOUR   = 14
-    CONGRESS_MINUTE = 30
-
-    INVESTORS_HOUR   = 16
-    INVESTORS_MINUTE = 30
+JOBS = [
+    # 0) INSIDER TRADING (L-V 10:15, operaciones de los últimos 2-3 días)
+    {"name": "insider",   "days": WEEKDAYS, "slots": [(10, 15)], "nyse": False, "window": "exact",
+     "force": FORCE_INSIDER,   "run": run_daily_insider},
+    # 0b) CONGRESISTAS USA (L-V 14:30, declaraciones recientes)
+    {"name": "congress",  "days": WEEKDAYS, "slots": [(14, 30)], "nyse": False, "window": "exact",
+     "force": FORCE_CONGRESS,  "run": run_congressional_trades},
+    # 0c) GRANDES INVERSORES (L-V 16:30, filings 13D/13G recientes)
+    {"name": "investors", "days": WEEKDAYS, "slots": [(16, 30)], "nyse": False, "window": "exact",
+     "force": FORCE_INVESTORS, "run": run_large_investors},
+    # 1) PREMARKET (solo días con NYSE abierto)
+    {"name": "premarket", "days": WEEKDAYS, "slots": [(10, 30)], "nyse": True,  "window": "hour",
+     "force": FORCE_MORNING,   "run": run_premarket_morning},
+    # 2) EARNINGS (lunes 10:30, 1 vez por semana)
+    {"name": "earnings",  "days": (0,),     "slots": [(10, 30)], "nyse": False, "window": "hour",
+     "force": FORCE_EARNINGS,  "run": _run_earnings},
+    # 3) CALENDARIO ECONÓMICO (L-V 11:30)
+    {"name": "econ",      "days": WEEKDAYS, "slots": [(11, 30)], "nyse": False, "window": "exact",
+     "force": FORCE_ECON or ECON_FORCE_TOMORROW, "run": _run_econ},
+    # 4) NOTICIAS (L-V 13:30 y 21:30)
+    {"name": "news",      "days": WEEKDAYS, "slots": [(13, 30), (21, 30)], "nyse": False, "window": "hour",
+     "force": FORCE_NEWS,      "run": run_news_once},
+    # 4b) INSTAGRAM — Insider Trading card (lunes 11:00, tras el post de las 10:15)
+    {"name": "instagram", "days": (0,),     "slots": [(11, 0)],  "nyse": False, "window": "exact",
+     "force": FORCE_INSTAGRAM, "run": _run_instagram},
+    # 5) MARKET CLOSE (solo días con NYSE abierto)
+    {"name": "close",     "days": WEEKDAYS, "slots": [(22, 30)], "nyse": True,  "window": "hour",
+     "force": CLOSE_FORCE,     "run": run_market_close},
+]
+
+
+def _nyse_open(dt_local: datetime) -> bool:
+    try:
+        from us_market_calendar import is_nyse_trading_day
+        return is_nyse_trading_day(dt_local)
+    except Exception as e:
+        print(f"WARNING | __main__: Fallo al evaluar calendario NYSE ({e}). Continuando sin filtro.")
+        return True
 
-    PREMARKET_HOUR = 10
-    PREMARKET_MINUTE = 30
 
-    EARNINGS_HOUR = 10
-    EARNINGS_MINUTE = 30
+def _is_due(job, now: datetime, nyse_open_today: bool) -> bool:
+    """Condición de disparo del modo cron (la misma que las antiguas comprobaciones)."""
+    if now.weekday() not in job["days"]:
+        return False
+    if job["nyse"] and not nyse_open_today:
+        return False
+    for hour, minute in job["slots"]:
+        if now.hour != hour:
+            continue
+        if now.minute == minute or (job["window"] == "hour" and now.minute >= minute):
+            return True
+    return False
 
-    ECON_HOUR = 11
-    ECON_MINUTE = 30
 
-    NEWS_HOUR_1 = 13
-    NEWS_HOUR_2 = 21
-    NEWS_MINUTE = 30
+def _tick(now: datetime) -> None:
+    """Una pasada de cron: ejecuta los jobs forzados o cuya franja coincide con `now`."""
+    # El calendario NYSE solo se consulta si algún job que lo exige está en franja
+    needs_nyse = any(job["nyse"] and not job["force"] and _is_due(job, now, True) for job in JOBS)
+    nyse_open_today = _nyse_open(now) if needs_nyse else None
 
     print(
-        f"INFO | __main__: weekday={weekday} hour={hour} minute={minute} "
-        f"nyse_open={nyse_open_today}"
+        f"INFO | __main__: weekday={now.weekday()} hour={now.hour} minute={now.minute} "
+        f"nyse_open={'n/a' if nyse_open_today is None else nyse_open_today}"
     )
 
-    # ======================================================
-    # 0) INSIDER TRADING (L-V 10:15, operaciones de los últimos 2-3 días)
-    # ======================================================
-    if FORCE_INSIDER:
-        run_daily_insider(force=True)
-    else:
-        if weekday < 5 and hour == INSIDER_HOUR and minute == INSIDER_MINUTE:
-            run_daily_insider(force=False)
+    ran = False
+    for job in JOBS:
+        if job["force"]:
+            job["run"](True)
+            ran = True
+        elif _is_due(job, now, bool(nyse_open_today)):
+            job["run"](False)
+            ran = True
 
-    # ======================================================
-    # 0b) CONGRESISTAS USA (L-V 14:30, declaraciones recientes)
-    # ======================================================
-    if FORCE_CONGRESS:
-        run_congressional_trades(force=True)
-    else:
-        if weekday < 5 and hour == CONGRESS_HOUR and minute == CONGRESS_MINUTE:
-            run_congressional_trades(force=False)
-
-    # ======================================================
-    # 0c) GRANDES INVERSORES (L-V 16:30, filings 13D/13G recientes)
-    # ======================================================
-    if FORCE_INVESTORS:
-        run_large_investors(force=True)
-    else:
-        if weekday < 5 and hour == INVESTORS_HOUR and minute == INVESTORS_MINUTE:
-            run_large_investors(force=False)
-
-    # ======================================================
-    # 1) PREMARKET
-    # ======================================================
-    if FORCE_MORNING:
-        run_premarket_morning(force=True)
-    else:
-        if weekday < 5 and nyse_open_today and hour == PREMARKET_HOUR and minute >= PREMARKET_MINUTE:
-            run_premarket_morning(force=False)
+    if ran:
+        # Latencias HTTP por host de esta ejecución
+        import http_client
+        http_client.log_metrics()
 
-    # ======================================================
-    # 2) EARNINGS (SIN CAMBIOS)
-    # ======================================================
-    if FORCE_EARNINGS:
-        run_weekly_earnings(force=True)
-    else:
-        if weekday == 0:
-            if hour == EARNINGS_HOUR and minute >= EARNINGS_MINUTE:
-                if not _earnings_already_sent_this_week(now):
-                    run_weekly_earnings(force=False)
-                    _mark_earnings_sent(now)
-
-    # ======================================================
-    # 3) CALENDARIO ECONÓMICO
-    # ======================================================
-    if ECON_FORCE_TOMORROW:
-        print("INFO | __main__: ECON_FORCE_TOMORROW=1 -> enviando calendario de mañana.")
-        run_econ_calendar(force=True, force_tomorrow=True)
 
-    elif FORCE_ECON:
-        run_econ_calendar(force=True)
+def main():
+    now = datetime.now(ZoneInfo("Europe/Madrid"))
+    print(f"{now} | INFO | __main__: Ejecutando main.py...")
+    _tick(now)
 
-    else:
-        if weekday < 5 and hour == ECON_HOUR and minute == ECON_MINUTE:
-            run_econ_calendar(force=False)
-
-    # ======================================================
-    # 4) NOTICIAS (SIN CAMBIOS)
-    # ======================================================
-    if FORCE_NEWS:
-        run_news_once(force=True)
-    else:
-        if weekday < 5:
-            if ((hour == NEWS_HOUR_1 and minute >= NEWS_MINUTE) or
-                (hour == NEWS_HOUR_2 and minute >= NEWS_MINUTE)):
-                run_news_once(force=False)
-
-    # ======================================================
-    # 4b) INSTAGRAM — Insider Trading card (lunes 11:00)
-    # Runs after the 10:15 Telegram post has cached the data.
-    # Tolerant to failure: any exception is caught so the bot continues.
-    # ======================================================
-    INSTAGRAM_HOUR   = 11
-    INSTAGRAM_MINUTE = 0
 
-    if FORCE_INSTAGRAM:
+# ======================================================
+# MODO DAEMON (proceso residente)
+# - Un solo arranque: los imports pesados se pagan una vez
+# - Próximo disparo calculado por job (sin depender de minute == X)
+# - Lock por job: si la ejecución anterior sigue en marcha, se omite
+# - FORCE_*: se ejecutan una vez al arrancar
+# Uso: python main.py --daemon   (o SCHEDULER_DAEMON=1)
+# ======================================================
+MISFIRE_GRACE_MIN = int(os.getenv("SCHEDULER_MISFIRE_GRACE_MIN", "15"))
+RETRY_DELAY_MIN   = int(os.getenv("SCHEDULER_RETRY_MIN", "5"))
+
+def _nyse_open_on(day) -> bool:
+    # Tabla precalculada en us_market_calendar: consulta O(1)
+    return _nyse_open(datetime(day.year, day.month, day.day, 12, 0))
+
+
+def _next_fire(job, after: datetime) -> datetime:
+    """Primera franja del job estrictamente posterior a `after`."""
+    tz = ZoneInfo("Europe/Madrid")
+    for offset in range(0, 15):
+        day = (after + timedelta(days=offset)).date()
+        if day.weekday() not in job["days"]:
+            continue
+        if job["nyse"] and not _nyse_open_on(day):
+            continue
+        for hour, minute in sorted(job["slots"]):
+            at = datetime(day.year, day.month, day.day, hour, minute, tzinfo=tz)
+            if at > after:
+                return at
+    return after + timedelta(days=15)
+
+
+def _window_end(job, at: datetime) -> datetime:
+    """Fin de la franja que empieza en `at`: fin de esa hora ("hour") o ese minuto ("exact")."""
+    if job["window"] == "hour":
+        return at.replace(minute=0) + timedelta(hours=1)
+    return at + timedelta(minutes=1)
+
+
+def _launch(job, force: bool, locks, on_fail=None) -> None:
+    lock = locks[job["name"]]
+    if not lock.acquire(blocking=False):
+        print(f"WARNING | __main__: {job['name']} sigue en marcha; se omite este disparo.")
+        return
+
+    def _worker():
+        failed = False
         try:
-            run_instagram_insider(force=True)
+            print(f"{datetime.now(ZoneInfo('Europe/Madrid'))} | INFO | __main__: Lanzando {job['name']} (force={force}).")
+            job["run"](force)
         except Exception as e:
-            print(f"WARNING | __main__: Instagram falló (force): {e}")
-    else:
-        if weekday == 0 and hour == INSTAGRAM_HOUR and minute == INSTAGRAM_MINUTE:
-            try:
-                run_instagram_insider(force=False)
-            except Exception as e:
-                print(f"WARNING | __main__: Instagram falló: {e}")
-
-    # ======================================================
-    # 5) MARKET CLOSE (SIN CAMBIOS)
-    # ======================================================
-    if CLOSE_FORCE:
-        run_market_close(force=True)
-    else:
-        if weekday < 5 and nyse_open_today and hour == 22 and minute >= 30:
-            run_market_close(force=False)
+            print(f"ERROR | __main__: {job['name']} falló: {e}")
+            failed = True
+        finally:
+            import http_client
+            http_client.log_metrics(reset=True)
+            lock.release()
+        if failed and on_fail:
+            on_fail()   # tras soltar el lock, para que el reintento no se omita
+
+    threading.Thread(target=_worker, name=f"job-{job['name']}", daemon=True).start()
+
+
+def run_daemon() -> None:
+    tz = ZoneInfo("Europe/Madrid")
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+
+    locks = {job["name"]: threading.Lock() for job in JOBS}
+    now = datetime.now(tz)
+    print(f"{now} | INFO | __main__: Scheduler residente arrancado ({len(JOBS)} jobs).")
+
+    for job in JOBS:
+        if job["force"]:
+            _launch(job, True, locks)
+
+    next_at = {job["name"]: _next_fire(job, now) for job in JOBS}
+    retry_at = {}   # job → (hora del reintento, inicio de la franja fallida)
+    retry_lock = threading.Lock()   # _schedule escribe desde el hilo del job
+
+    def _on_fail(job, slot_at):
+        def _schedule():
+            retry = datetime.now(tz) + timedelta(minutes=RETRY_DELAY_MIN)
+            if retry < _window_end(job, slot_at):
+                with retry_lock:
+                    retry_at[job["name"]] = (retry, slot_at)
+                print(f"INFO | __main__: reintento de {job['name']} a las {retry:%H:%M}.")
+        return _schedule
+    for job in JOBS:
+        print(f"INFO | __main__: próximo {job['name']}: {next_at[job['name']]:%a %d/%m %H:%M}")
+
+    try:
+        while not stop.is_set():
+            now = datetime.now(tz)
+            for job in JOBS:
+                at = next_at[job["name"]]
+                if at > now:
+                    continue
+                if now - at <= timedelta(minutes=MISFIRE_GRACE_MIN):
+                    _launch(job, False, locks, on_fail=_on_fail(job, at))
+                else:
+                    print(f"WARNING | __main__: {job['name']} perdió la franja de {at:%H:%M}; se omite.")
+                next_at[job["name"]] = _next_fire(job, now)
+                print(f"INFO | __main__: próximo {job['name']}: {next_at[job['name']]:%a %d/%m %H:%M}")
+
+            with retry_lock:
+                due = [(job, retry_at.pop(job["name"])[1]) for job in JOBS
+                       if job["name"] in retry_at and retry_at[job["name"]][0] <= now]
+                pending = [r[0] for r in retry_at.values()]
+            for job, slot_at in due:
+                _launch(job, False, locks, on_fail=_on_fail(job, slot_at))
+
+            upcoming = list(next_at.values()) + pending
+            wait = (min(upcoming) - datetime.now(tz)).total_seconds()
+            stop.wait(max(1.0, min(wait, 60.0)))
+    except KeyboardInterrupt:
+        pass
+    print(f"{datetime.now(tz)} | INFO | __main__: Scheduler residente detenido.")
 
 
 if __name__ == "__main__":
-    main()
+    if "--daemon" in sys.argv or os.getenv("SCHEDULER_DAEMON", "0").strip().lower() in ("1", "true", "yes"):
+        run_daemon()
+    else:
+        main()
@@ -6,6 +6,7 @@
 
 import os
 import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 from typing import Optional, Dict, List
 
@@ -17,9 +18,10 @@ import matplotlib.pyplot as plt
 import matplotlib.gridspec as gridspec
 import matplotlib.patches as mpatches
 
-import requests
+import pandas as pd
 import yfinance as yf
 
+import http_client
 from utils import call_gpt_mini
 
 # ================================
@@ -30,6 +32,9 @@ CHAT_ID = os.getenv("TELEGRAM_CHAT_ID") or os.getenv("CHAT_ID")
 
 _FG_API_URL = "https://production.dataviz.cnn.io/index/fearandgreed/graphdata"
 
+# Hilos máximos contra Yahoo (descarga batch + fallback por ticker)
+YF_MAX_WORKERS = max(1, int(os.getenv("CLOSE_YF_WORKERS", "6")))
+
 _FG_RATING_ES = {
     "Extreme Fear": "Miedo extremo",
     "Fear":         "Miedo",
@@ -82,7 +87,7 @@ def send_telegram(text: str) -> None:
             "disable_web_page_preview": True,
         }
         try:
-            r = requests.post(url, data=payload, timeout=20)
+            r = http_client.post(url, data=payload, timeout=20)
             if r.status_code >= 400:
                 print(f"[WARN] Telegram HTTP {r.status_code} (chunk {idx}): {r.text[:200]}")
         except Exception as e:
@@ -104,7 +109,7 @@ def send_telegram_photo(img_bytes: bytes, caption: str = "") -> None:
         data["caption"] = caption[:1024]
 
     try:
-        r = requests.post(url, data=data, files=files, timeout=30)
+        r = http_client.post(url, data=data, files=files, timeout=30)
         if r.status_code >= 400:
             print(f"[WARN] Telegram sendPhoto HTTP {r.status_code}: {r.text[:200]}")
         else:
@@ -116,21 +121,72 @@ def send_telegram_photo(img_bytes: bytes, caption: str = "") -> None:
 # ================================
 # UTILIDADES YFINANCE
 # ================================
+def _pct_from_closes(closes) -> Optional[float]:
+    closes = closes.dropna()
+    if len(closes) < 2:
+        return None
+    prev_close = float(closes.iloc[-2])
+    last_close = float(closes.iloc[-1])
+    if prev_close == 0:
+        return None
+    return (last_close - prev_close) / prev_close * 100.0
+
+
 def get_pct_change(symbol: str) -> Optional[float]:
     try:
         data = yf.Ticker(symbol).history(period="2d")
         if data is None or data.empty or len(data) < 2:
             return None
-        prev_close = float(data["Close"].iloc[-2])
-        last_close = float(data["Close"].iloc[-1])
-        if prev_close == 0:
-            return None
-        return (last_close - prev_close) / prev_close * 100.0
+        return _pct_from_closes(data["Close"])
     except Exception as e:
         print(f"[YF] Error {symbol}: {e}")
         return None
 
 
+def get_pct_changes(symbols: List[str]) -> Dict[str, Optional[float]]:
+    """
+    Variación diaria de muchos símbolos de una vez.
+    Una sola descarga yf.download (frame ancho de cierres, hilos acotados
+    a YF_MAX_WORKERS) y cálculo de todos los % en una pasada. Los símbolos
+    que no vengan en el batch se reintentan con get_pct_change en un pool
+    del mismo tamaño.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    changes: Dict[str, Optional[float]] = {s: None for s in symbols}
+    if not symbols:
+        return changes
+
+    try:
+        df = yf.download(
+            tickers=symbols,
+            period="5d",
+            interval="1d",
+            auto_adjust=True,
+            threads=YF_MAX_WORKERS,
+            progress=False,
+        )
+        closes = df["Close"] if df is not None and not df.empty else None
+    except Exception as e:
+        print(f"[YF] Error descarga batch: {e}")
+        closes = None
+
+    if closes is not None:
+        if isinstance(closes, pd.Series):
+            closes = closes.to_frame(symbols[0])
+        for sym in closes.columns:
+            if sym in changes:
+                changes[sym] = _pct_from_closes(closes[sym])
+
+    missing = [s for s, v in changes.items() if v is None]
+    if missing:
+        print(f"[YF] {len(missing)} símbolos sin dato en batch, reintentando: {missing}")
+        with ThreadPoolExecutor(max_workers=min(YF_MAX_WORKERS, len(missing))) as pool:
+            for sym, pct in zip(missing, pool.map(get_pct_change, missing)):
+                changes[sym] = pct
+
+    return changes
+
+
 def avg_change(values: List[Optional[float]]) -> Optional[float]:
     nums = [v for v in values if v is not None]
     return sum(nums) / len(nums) if nums else None
@@ -163,7 +219,7 @@ def _fetch_vix() -> Optional[Dict]:
 
 def _fetch_fear_and_greed() -> Optional[Dict]:
     try:
-        resp = requests.get(
+        resp = http_client.get(
             _FG_API_URL,
             headers={"User-Agent": "Mozilla/5.0", "Referer": "https://edition.cnn.com/"},
             timeout=10,
@@ -199,8 +255,10 @@ def _vix_label(value: float) -> str:
 # ================================
 def _fetch_crypto_close() -> List[Dict]:
     results = []
-    for name, ticker in [("BTC", "BTC-USD"), ("ETH", "ETH-USD")]:
-        pct = get_pct_change(ticker)
+    pairs = [("BTC", "BTC-USD"), ("ETH", "ETH-USD")]
+    changes = get_pct_changes([ticker for _, ticker in pairs])
+    for name, ticker in pairs:
+        pct = changes.get(ticker)
         if pct is not None:
             results.append({"name": name, "change_pct": round(pct, 2)})
     return results
@@ -251,12 +309,6 @@ def get_close_market_data():
         "Dow Jones":   "^DJI",
         "Russell 2000":"^RUT",
     }
-    indices = []
-    for name, symbol in indices_map.items():
-        pct = get_pct_change(symbol)
-        if pct is not None:
-            indices.append({"name": name, "symbol": symbol, "change_pct": round(pct, 2)})
-
     sector_tickers: Dict[str, List[str]] = {
         "Tecnología / Comunicación": ["AAPL", "MSFT", "GOOGL", "META", "AMZN", "NFLX"],
         "Semiconductores":           ["NVDA", "AMD", "INTC", "AVGO", "QCOM"],
@@ -269,7 +321,15 @@ def get_close_market_data():
     }
 
     all_tickers = sorted({t for lst in sector_tickers.values() for t in lst})
-    ticker_changes: Dict[str, Optional[float]] = {t: get_pct_change(t) for t in all_tickers}
+    ticker_changes: Dict[str, Optional[float]] = get_pct_changes(
+        list(indices_map.values()) + all_tickers
+    )
+
+    indices = []
+    for name, symbol in indices_map.items():
+        pct = ticker_changes.get(symbol)
+        if pct is not None:
+            indices.append({"name": name, "symbol": symbol, "change_pct": round(pct, 2)})
 
     sectors: Dict[str, List[Dict]] = {}
     for sector, tks in sector_tickers.items():
@@ -478,7 +538,7 @@ def _fetch_finviz_heatmap() -> Optional[bytes]:
     Devuelve bytes PNG o None si Finviz bloquea la IP del datacenter.
     """
     try:
-        resp = requests.get(_FINVIZ_HEATMAP_URL, headers=_FINVIZ_HEADERS, timeout=15)
+        resp = http_client.get(_FINVIZ_HEATMAP_URL, headers=_FINVIZ_HEADERS, timeout=15)
         ct = resp.headers.get("content-type", "")
         if resp.ok and ct.startswith("image/"):
             print(f"[market_close] Finviz heatmap OK ({len(resp.content):,} bytes).")
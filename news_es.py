@@ -6,13 +6,22 @@ import json
 import calendar
 import html
 import math
+import random
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
 from datetime import datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
 from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
 
 import feedparser
-import requests
 
+import http_cache
+import http_client
+from trie_regex import trie_pattern
 from utils import call_gpt_mini  # fallback traducción + briefs
 
 # ========= Config =========
@@ -20,10 +29,21 @@ CHAT_ID        = os.getenv("CHAT_ID") or os.getenv("TELEGRAM_CHAT_ID")
 BOT_TOKEN      = os.getenv("INVESTX_TOKEN") or os.getenv("TELEGRAM_TOKEN")
 DEEPL_API_KEY  = (os.getenv("DEEPL_API_KEY") or "").strip()
 DEEPL_PLAN     = (os.getenv("DEEPL_PLAN") or "").strip().lower()  # "free" | "pro" (auto si vacío)
+DEEPL_BATCH    = 50                               # máx campos `text` por petición DeepL
+DEEPL_PLAN_FILE = "news_deepl_plan.json"          # endpoint que funcionó (modo auto)
 
 LOCAL_TZ       = ZoneInfo(os.getenv("LOCAL_TZ", "Europe/Madrid"))
 LOOKBACK_HOURS = int(os.getenv("LOOKBACK_HOURS", "10"))
 
+# Near-duplicates entre fuentes (MinHash + LSH sobre tokens del título)
+DUP_THRESHOLD     = float(os.getenv("NEWS_DUP_THRESHOLD", "0.5"))    # Jaccard mínimo
+DUP_CLUSTER_BONUS = float(os.getenv("NEWS_DUP_BONUS", "1.5"))        # score por fuente extra
+DUP_BANDS, DUP_ROWS = 10, 2                                          # 20 hashes por título
+
+# Titulares ya publicados: no se repiten dentro de esta ventana
+SENT_INDEX_FILE = "news_sent_index.json"
+SENT_TTL_HOURS  = float(os.getenv("NEWS_SENT_TTL_HOURS", "36"))
+
 # Objetivo 5–6 (cap duro 6)
 MAX_ITEMS_ENV  = int(os.getenv("MAX_ITEMS", "6"))
 MAX_ITEMS      = min(6, max(3, MAX_ITEMS_ENV))  # duro 6, mínimo razonable 3
@@ -57,22 +77,29 @@ FEEDS = [
     "https://feeds.a.dj.com/rss/RSSMarketsMain.xml",
     "https://www.ft.com/companies?format=rss",
 ]
+FEED_TIMEOUT    = float(os.getenv("NEWS_FEED_TIMEOUT", "8"))      # seg por feed
+CRAWL_DEADLINE  = float(os.getenv("NEWS_CRAWL_DEADLINE", "20"))   # seg para todo el crawl
+FEED_CACHE_FILE = "news_feed_cache.json"
 
 DIAS_ES = ["Lun", "Mar", "Mié", "Jue", "Vie", "Sáb", "Dom"]
 MESES_ES = ["Ene", "Feb", "Mar", "Abr", "May", "Jun", "Jul", "Ago", "Sep", "Oct", "Nov", "Dic"]
 
-TRANSLATION_CACHE_FILE = "news_translation_cache.json"
-
-# ========= Session =========
-def build_requests_session() -> requests.Session:
-    s = requests.Session()
-    s.headers.update({
-        "User-Agent": "InvestX-NewsBot/1.2",
-        "Accept": "application/json, text/plain, */*",
-    })
-    return s
-
-SESSION = build_requests_session()
+TRANSLATION_CACHE_FILE  = "news_translation_cache.json"    # formato antiguo (solo migración)
+TRANSLATION_LOG_FILE    = "news_translation_cache.jsonl"
+TRANSLATION_MAX_ENTRIES = int(os.getenv("TRANSLATION_MAX_ENTRIES", "5000"))
+TRANSLATION_TTL_DAYS    = float(os.getenv("TRANSLATION_TTL_DAYS", "30"))
+
+# ========= HTTP =========
+# Todas las peticiones van por http_client (session keep-alive por host,
+# reintentos y límite de Telegram); aquí solo las cabeceras propias del bot.
+HTTP_HEADERS = {
+    "User-Agent": "InvestX-NewsBot/1.2",
+    "Accept": "application/json, text/plain, */*",
+}
+FEED_HEADERS = {
+    "User-Agent": "InvestX-NewsBot/1.2",
+    "Accept": "application/rss+xml, application/xml, text/xml, */*",
+}
 
 # ========= Utilidades =========
 def fecha_es(dt: datetime) -> str:
@@ -91,6 +118,9 @@ def source_label(url: str) -> str:
     except Exception:
         return "Fuente"
 
+def domain_of(url: str) -> str:
+    return urlparse(url).netloc.lower().replace("www.", "")
+
 def html_escape(s: str) -> str:
     return html.escape(s or "", quote=False)
 
@@ -109,94 +139,240 @@ def normalize_url(u: str) -> str:
     except Exception:
         return u
 
-def _load_cache():
+# ========= Caché de traducciones =========
+class TranslationStore:
+    """
+    Caché de traducciones acotada con log append-only (JSONL).
+    - Cada alta o acierto añade una línea [ts, original, traducción] → O(1)
+    - Al cargar: última línea por clave, fuera lo caducado (TTL) y solo las
+      TRANSLATION_MAX_ENTRIES más recientes (LRU)
+    - El fichero se reescribe compactado cuando crece al doble de lo vivo,
+      tanto al cargar como al escribir (el daemon no recarga nunca)
+    - Contadores de hits/misses por ejecución (reset_stats al empezar cada una)
+    """
+
+    def __init__(self, path: str, max_entries: int, ttl_days: float):
+        self.path        = path
+        self.max_entries = max(1, max_entries)
+        self.ttl         = ttl_days * 86400
+        self.hits        = 0
+        self.misses      = 0
+        self._lines      = 0     # líneas en el log (vivas + obsoletas)
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()   # clave → (ts, traducción)
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        lines, migrated = 0, False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        ts, src, dst = json.loads(line)
+                    except Exception:
+                        continue
+                    lines += 1
+                    self._data.pop(src, None)
+                    self._data[src] = (ts, dst)
+        except FileNotFoundError:
+            # Migración desde el JSON antiguo (se importa una sola vez)
+            try:
+                with open(TRANSLATION_CACHE_FILE, "r", encoding="utf-8") as f:
+                    now = time.time()
+                    for src, dst in (json.load(f) or {}).items():
+                        self._data[src] = (now, dst)
+                migrated = True
+            except Exception:
+                pass
+        except Exception:
+            pass
+
+        cutoff = time.time() - self.ttl
+        live = [(k, v) for k, v in self._data.items() if v[0] >= cutoff]
+        self._data = OrderedDict(live[-self.max_entries:])
+        self._lines = lines
+        if migrated or self._too_long():
+            self._compact()
+
+    def _too_long(self) -> bool:
+        # Compactar solo cuando el log dobla a lo vivo (coste amortizado)
+        return self._lines > 2 * len(self._data) + 100
+
+    def _compact(self):
+        try:
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                for src, (ts, dst) in self._data.items():
+                    f.write(json.dumps([ts, src, dst], ensure_ascii=False) + "\n")
+            os.replace(tmp, self.path)
+            self._lines = len(self._data)
+        except Exception:
+            pass
+
+    def _append(self, src: str, ts: float, dst: str):
+        """Añade una línea al log; se llama con el lock tomado."""
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps([ts, src, dst], ensure_ascii=False) + "\n")
+            self._lines += 1
+        except Exception:
+            return
+        if self._too_long():
+            self._compact()
+
+    def get(self, src: str):
+        with self._lock:
+            hit = self._data.get(src)
+            if hit is None or hit[0] < time.time() - self.ttl:
+                self.misses += 1
+                return None
+            self.hits += 1
+            now = time.time()
+            self._data.move_to_end(src)
+            self._data[src] = (now, hit[1])
+            self._append(src, now, hit[1])
+        return hit[1]
+
+    def put(self, src: str, dst: str):
+        now = time.time()
+        with self._lock:
+            self._data.pop(src, None)
+            self._data[src] = (now, dst)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+            self._append(src, now, dst)
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def stats(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses, {len(self._data)} entradas"
+
+_TRANSLATIONS = TranslationStore(TRANSLATION_LOG_FILE, TRANSLATION_MAX_ENTRIES, TRANSLATION_TTL_DAYS)
+
+# ========= Traducción (DeepL por lotes + GPT por lotes) =========
+_DEEPL_BASES = {"pro": "https://api.deepl.com", "free": "https://api-free.deepl.com"}
+
+def _deepl_plans():
+    """Orden de endpoints a probar: DEEPL_PLAN fijo, o el último que funcionó primero."""
+    if DEEPL_PLAN in _DEEPL_BASES:
+        return [DEEPL_PLAN]
     try:
-        if os.path.exists(TRANSLATION_CACHE_FILE):
-            with open(TRANSLATION_CACHE_FILE, "r", encoding="utf-8") as f:
-                return json.load(f) or {}
+        with open(DEEPL_PLAN_FILE, "r", encoding="utf-8") as f:
+            known = json.load(f).get("plan")
     except Exception:
-        pass
-    return {}
-
-def _save_cache(d):
+        known = None
+    order = ["pro", "free"]
+    if known in order:
+        order.remove(known)
+        order.insert(0, known)
+    return order
+
+def _remember_deepl_plan(plan: str):
     try:
-        with open(TRANSLATION_CACHE_FILE, "w", encoding="utf-8") as f:
-            json.dump(d, f, ensure_ascii=False)
+        with open(DEEPL_PLAN_FILE, "w", encoding="utf-8") as f:
+            json.dump({"plan": plan, "saved_at": datetime.now(timezone.utc).isoformat()}, f)
     except Exception:
         pass
 
-_TRANSLATION_CACHE = _load_cache()
+def deepl_translate_batch(texts):
+    """
+    Traduce una lista con DeepL enviando varios campos `text` por petición
+    (máx DEEPL_BATCH por llamada). Devuelve lista alineada; None si falló.
+    """
+    out = [None] * len(texts)
+    if not DEEPL_API_KEY or not texts:
+        return out
+
+    plans = _deepl_plans()
+    for i in range(0, len(texts), DEEPL_BATCH):
+        chunk = texts[i:i + DEEPL_BATCH]
+        for plan in list(plans):
+            try:
+                r = http_client.post(
+                    f"{_DEEPL_BASES[plan]}/v2/translate",
+                    headers=dict(HTTP_HEADERS, Authorization=f"DeepL-Auth-Key {DEEPL_API_KEY}"),
+                    data=[("text", t) for t in chunk] + [("target_lang", "ES")],
+                    timeout=15,
+                )
+                r.raise_for_status()
+                translations = r.json()["translations"]
+            except Exception:
+                continue
+            if plan != plans[0]:
+                # El endpoint bueno pasa a ser el primero (y se recuerda)
+                plans.remove(plan)
+                plans.insert(0, plan)
+                if not DEEPL_PLAN:
+                    _remember_deepl_plan(plan)
+            for j, tr in enumerate(translations[:len(chunk)]):
+                out[i + j] = tr.get("text") or None
+            break
+    return out
 
 def deepl_translate(text: str) -> str:
-    if not DEEPL_API_KEY or not text:
-        return text
-    try:
-        if DEEPL_PLAN:
-            base = "https://api-free.deepl.com" if DEEPL_PLAN == "free" else "https://api.deepl.com"
-        else:
-            # auto: pro -> free
-            for base in ("https://api.deepl.com", "https://api-free.deepl.com"):
-                try:
-                    r = SESSION.post(
-                        f"{base}/v2/translate",
-                        data={"auth_key": DEEPL_API_KEY, "text": text, "target_lang": "ES"},
-                        timeout=15,
-                    )
-                    r.raise_for_status()
-                    js = r.json()
-                    return js["translations"][0]["text"]
-                except Exception:
-                    continue
-            return text
-
-        r = SESSION.post(
-            f"{base}/v2/translate",
-            data={"auth_key": DEEPL_API_KEY, "text": text, "target_lang": "ES"},
-            timeout=15,
-        )
-        r.raise_for_status()
-        js = r.json()
-        return js["translations"][0]["text"]
-    except Exception:
+    if not text:
         return text
+    return deepl_translate_batch([text])[0] or text
 
-def translate_to_es(text: str) -> str:
+def _gpt_translate_batch(texts):
+    """Fallback: una sola llamada a GPT-mini con los textos numerados."""
+    if not texts:
+        return []
+    system = (
+        "Eres traductor financiero profesional. Traduce al español neutro y natural, sin añadir información. "
+        "Devuelve ÚNICAMENTE las traducciones, una por línea, con el mismo número y en el mismo orden."
+    )
+    user = "Traduce al español (máx 1 frase cada una), sin inventar nada:\n\n" + "\n".join(
+        f"{i}. {' '.join(t.split())}" for i, t in enumerate(texts, start=1)
+    )
+    result = (call_gpt_mini(system, user, max_tokens=min(4000, 120 * len(texts))) or "").strip()
+
+    out = [None] * len(texts)
+    for ln in result.split("\n"):
+        m = re.match(r"\s*(\d+)[.)]\s*(.+)", ln)
+        if m and 1 <= int(m.group(1)) <= len(texts):
+            out[int(m.group(1)) - 1] = m.group(2).strip()
+    return out
+
+def translate_many(texts):
     """
-    Traducción garantizada:
-    - Cache -> DeepL -> GPT-mini fallback
+    Traduce una lista manteniendo el orden:
+    - Cache -> DeepL (una petición para todos los fallos) -> GPT-mini (una llamada)
+    Lo que no se pueda traducir se devuelve en original.
     """
-    if not text:
-        return ""
-    key = text.strip()
-    if key in _TRANSLATION_CACHE:
-        return _TRANSLATION_CACHE[key]
-
-    out = deepl_translate(key)
-    if out and out != key:
-        _TRANSLATION_CACHE[key] = out
-        _save_cache(_TRANSLATION_CACHE)
-        return out
+    keys = [(t or "").strip() for t in texts]
+    done = {}
+    missing = []
+    for k in dict.fromkeys(keys):
+        if not k:
+            done[k] = ""
+            continue
+        cached = _TRANSLATIONS.get(k)
+        if cached is not None:
+            done[k] = cached
+        else:
+            missing.append(k)
 
-    # fallback GPT-mini (si no hay key, utils devuelve "")
-    system = "Eres traductor financiero profesional. Traduce al español neutro y natural, sin añadir información."
-    user = f"Traduce al español (máx 1 frase), sin inventar nada:\n\n{key}"
-    g = (call_gpt_mini(system, user, max_tokens=120) or "").strip()
-    if g:
-        _TRANSLATION_CACHE[key] = g
-        _save_cache(_TRANSLATION_CACHE)
-        return g
+    if missing:
+        for k, out in zip(missing, deepl_translate_batch(missing)):
+            if out and out != k:
+                done[k] = out
+                _TRANSLATIONS.put(k, out)
 
-    return key  # último recurso
+        rest = [k for k in missing if k not in done]
+        for k, out in zip(rest, _gpt_translate_batch(rest)):
+            if out:
+                done[k] = out
+                _TRANSLATIONS.put(k, out)
 
+    return [done.get(k, k) for k in keys]
+
+def translate_to_es(text: str) -> str:
+    """Traducción garantizada de un solo texto (ver translate_many)."""
+    return translate_many([text])[0]
 
-_TICKER_PATTERNS = [
-    re.compile(rf"(?<![A-Z0-9]){re.escape(t)}(?![A-Z0-9])")
-    for t in WATCHLIST if t
-]
-_IMPORTANT_PATTERNS = [
-    re.compile(rf"\b{re.escape(term)}\b", re.IGNORECASE)
-    for term in IMPORTANT_ENTITIES
-]
 
 # ========= Clasificación temática =========
 EARNINGS_TERMS = (
@@ -222,75 +398,105 @@ LAST_HOUR_TERMS = (
     "cpi","ipc","nonfarm","nfp","fed decision","rate decision"
 )
 
-def _has_watchlist_ticker(title: str) -> bool:
-    up = (title or "").upper()
-    return any(pat.search(up) for pat in _TICKER_PATTERNS)
-
-def _has_company_name(title: str) -> bool:
+# Términos que solo puntúan
+HARD_MACRO_TERMS = ("cpi","ipc","pce","nonfarm","nfp","jobless","fed","ecb","boe","treasury","auction","yield")
+BREAKING_TERMS   = ("breaking","urgent","profit warning")
+
+# ========= Matcher compilado =========
+# Todos los términos (substrings) van en una sola regex con forma de trie, así
+# el coste por título depende de su longitud y no del nº de términos: se puede
+# ampliar WATCHLIST / COMPANY_NAMES a cientos de nombres sin ralentizar.
+_TERM_GROUPS = {
+    "keyword":   KEYWORDS,
+    "company":   COMPANY_NAMES,
+    "earnings":  EARNINGS_TERMS,
+    "deals":     DEAL_TERMS,
+    "macro":     MACRO_TERMS,
+    "politics":  POLITICS_TERMS,
+    "last_hour": LAST_HOUR_TERMS,
+    "hard_macro": HARD_MACRO_TERMS,
+    "breaking":  BREAKING_TERMS,
+}
+_KEYWORD_WEIGHT = {}          # término → +2 por cada aparición en KEYWORDS
+for _k in KEYWORDS:
+    _KEYWORD_WEIGHT[_k] = _KEYWORD_WEIGHT.get(_k, 0.0) + 2.0
+
+_TERM_INFO = {}               # término → grupos a los que pertenece
+for _g, _terms in _TERM_GROUPS.items():
+    for _k in _terms:
+        if _k:
+            _TERM_INFO.setdefault(_k, set()).add(_g)
+
+# Un término encontrado implica todos los términos que contiene (p.ej.
+# "profit warning" ⊃ "profit"): así basta el más largo en cada posición.
+_TERM_IMPLIED = {
+    k: (frozenset().union(*(_TERM_INFO[j] for j in _TERM_INFO if j in k)),
+        frozenset(j for j in _KEYWORD_WEIGHT if j in k))
+    for k in _TERM_INFO
+}
+# Lookahead: prueba en cada posición (coincidencias solapadas)
+_TERM_RE      = re.compile("(?=(" + trie_pattern(_TERM_INFO) + "))")
+_TICKER_RE    = re.compile("(?<![A-Z0-9])(?:" + trie_pattern([t for t in WATCHLIST if t]) + ")(?![A-Z0-9])") \
+    if WATCHLIST else None
+_IMPORTANT_RE = re.compile(r"\b(?:" + trie_pattern([t for t in IMPORTANT_ENTITIES if t]) + r")\b", re.IGNORECASE) \
+    if IMPORTANT_ENTITIES else None
+
+@lru_cache(maxsize=65536)
+def _analyze_title(title: str):
+    """
+    Una sola pasada por el título → (score base, categoría, última hora).
+    Cacheado por título: select_items / run_news_once / score lo reutilizan.
+    """
     t = (title or "").lower()
-    return any(n in t for n in COMPANY_NAMES)
+    groups, keywords = set(), set()
+    for k in set(m.group(1) for m in _TERM_RE.finditer(t)):
+        groups   |= _TERM_IMPLIED[k][0]
+        keywords |= _TERM_IMPLIED[k][1]
+    has_ticker  = bool(_TICKER_RE and _TICKER_RE.search((title or "").upper()))
+    has_company = "company" in groups
+
+    score = sum(_KEYWORD_WEIGHT[k] for k in keywords)
+    if has_ticker:
+        score += 3.0
+    if has_company:
+        score += 2.0
+    if _IMPORTANT_RE and _IMPORTANT_RE.search(title or ""):
+        score += 2.0
+    if "earnings" in groups:
+        score += 4.0
+    if "deals" in groups:
+        score += 3.5
+    if "hard_macro" in groups:
+        score += 2.0
+    if "breaking" in groups:
+        score += 4.0
 
-def classify_item(title: str) -> str:
-    t = (title or "").lower()
+    if "earnings" in groups:
+        cat = "earnings"
+    elif "deals" in groups:
+        cat = "deals"
+    elif has_ticker or has_company:
+        cat = "company"
+    elif "macro" in groups:
+        cat = "macro"
+    elif "politics" in groups:
+        cat = "politics"
+    else:
+        cat = "other"
 
-    if any(k in t for k in EARNINGS_TERMS):
-        return "earnings"
-    if any(k in t for k in DEAL_TERMS):
-        return "deals"
-    if _has_watchlist_ticker(title) or _has_company_name(title):
-        return "company"
-    if any(k in t for k in MACRO_TERMS):
-        return "macro"
-    if any(k in t for k in POLITICS_TERMS):
-        return "politics"
-    return "other"
+    # combo: watchlist + (earnings/deal) => última hora
+    last_hour = "last_hour" in groups or (has_ticker and ("earnings" in groups or "deals" in groups))
+    return score, cat, last_hour
+
+def classify_item(title: str) -> str:
+    return _analyze_title(title)[1]
 
 def is_last_hour(title: str) -> bool:
-    t = (title or "").lower()
-    if any(k in t for k in LAST_HOUR_TERMS):
-        return True
-    # combo: watchlist + (earnings/deal) => última hora
-    if _has_watchlist_ticker(title) and (any(k in t for k in EARNINGS_TERMS) or any(k in t for k in DEAL_TERMS)):
-        return True
-    return False
+    return _analyze_title(title)[2]
 
 # ========= Scoring =========
 def score_item(title: str, link: str, published_utc: datetime) -> float:
-    t = (title or "").lower()
-    score = 0.0
-
-    # keywords generales
-    for k in KEYWORDS:
-        if k and k in t:
-            score += 2.0
-
-    # watchlist tickers
-    if _has_watchlist_ticker(title):
-        score += 3.0
-
-    # nombres empresas
-    if _has_company_name(title):
-        score += 2.0
-
-    # política importante (bajamos peso para que no monopolice)
-    for pat in _IMPORTANT_PATTERNS:
-        if pat.search(title or ""):
-            score += 2.0
-            break
-
-    # bonus corporativo (earnings/deals)
-    if any(k in t for k in EARNINGS_TERMS):
-        score += 4.0
-    if any(k in t for k in DEAL_TERMS):
-        score += 3.5
-
-    # macro “hard”
-    if any(k in t for k in ("cpi","ipc","pce","nonfarm","nfp","jobless","fed","ecb","boe","treasury","auction","yield")):
-        score += 2.0
-
-    # breaking cues
-    if any(k in t for k in ("breaking","urgent","profit warning")):
-        score += 4.0
+    score = _analyze_title(title)[0]
 
     # fuente
     if "cnbc.com" in (link or "").lower():
@@ -311,31 +517,95 @@ def _to_dt_utc(entry):
 
 # ========= Fetch =========
 def fetch_items():
+    """
+    Items de los feeds (dedupe + score). Memoizado por ejecución: premarket,
+    market_close y news comparten el mismo crawl; los cuerpos de los feeds
+    además se reutilizan entre ejecuciones vía http_cache (TTL corto).
+    """
+    return list(http_cache.memoize("news_es.fetch_items", _crawl_items))
+
+# Caché de entradas ya extraídas por feed: si la versión (ETag/Last-Modified)
+# no cambia, no se vuelve a pasar el XML por feedparser.
+_FEED_CACHE = None
+_FEED_CACHE_LOCK = threading.Lock()
+
+def _feed_cache():
+    global _FEED_CACHE
+    with _FEED_CACHE_LOCK:
+        if _FEED_CACHE is None:
+            try:
+                with open(FEED_CACHE_FILE, "r", encoding="utf-8") as f:
+                    _FEED_CACHE = json.load(f)
+            except Exception:
+                _FEED_CACHE = {}
+        return _FEED_CACHE
+
+def _save_feed_cache():
+    with _FEED_CACHE_LOCK:
+        if _FEED_CACHE is None:
+            return
+        try:
+            with open(FEED_CACHE_FILE, "w", encoding="utf-8") as f:
+                json.dump({u: v for u, v in _FEED_CACHE.items() if u in FEEDS}, f, ensure_ascii=False)
+        except Exception:
+            pass
+
+def _parse_feed(body: bytes):
+    """XML del feed → [[ts_utc, title, link_norm, desc], ...] (máx 120 entradas)."""
+    out = []
+    for e in feedparser.parse(body).entries[:120]:
+        dt_utc = _to_dt_utc(e)
+        title = (getattr(e, "title", "") or "").strip()
+        link  = (getattr(e, "link", "")  or "").strip()
+        if not dt_utc or not title or not link:
+            continue
+        desc = (getattr(e, "summary", "") or "").strip()
+        out.append([dt_utc.timestamp(), title, normalize_url(link), desc])
+    return out
+
+def _feed_entries(url: str):
+    """Entradas de un feed: GET condicional con timeout propio; parsea solo si cambió."""
+    version, body = http_cache.get_versioned(url, headers=FEED_HEADERS, timeout=FEED_TIMEOUT)
+    cache = _feed_cache()
+    with _FEED_CACHE_LOCK:
+        hit = cache.get(url)
+    if hit and hit.get("version") == version:
+        return hit["entries"]
+    entries = _parse_feed(body)
+    with _FEED_CACHE_LOCK:
+        cache[url] = {"version": version, "entries": entries}
+    return entries
+
+def _crawl_items():
     items = []
     now_utc = datetime.now(timezone.utc)
     cutoff = now_utc - timedelta(hours=LOOKBACK_HOURS)
 
-    feedparser.USER_AGENT = "InvestX-NewsBot/1.2"
+    # Feeds en paralelo: un host caído solo cuesta su timeout, y el crawl
+    # entero no pasa de CRAWL_DEADLINE (los rezagados se descartan).
+    per_feed = {}
+    pool = ThreadPoolExecutor(max_workers=len(FEEDS))
+    futs = {pool.submit(_feed_entries, url): url for url in FEEDS}
+    try:
+        for fut in as_completed(futs, timeout=CRAWL_DEADLINE):
+            try:
+                per_feed[futs[fut]] = fut.result()
+            except Exception as e:
+                print(f"[news] Feed con error ({futs[fut]}): {e}")
+    except FuturesTimeout:
+        late = [futs[f] for f in futs if not f.done()]
+        print(f"[news] Feeds descartados por deadline ({CRAWL_DEADLINE:.0f}s): {late}")
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    _save_feed_cache()
 
     for url in FEEDS:
-        try:
-            feed = feedparser.parse(url)
-            for e in feed.entries[:120]:
-                dt_utc = _to_dt_utc(e)
-                if not dt_utc or dt_utc < cutoff:
-                    continue
-
-                title = (getattr(e, "title", "") or "").strip()
-                link  = (getattr(e, "link", "")  or "").strip()
-                if not title or not link:
-                    continue
-
-                link_norm = normalize_url(link)
-                s = score_item(title, link_norm, dt_utc)
-                desc = (getattr(e, "summary", "") or "").strip()
-                items.append((s, dt_utc, title, link_norm, desc))
-        except Exception:
-            continue
+        for ts, title, link_norm, desc in per_feed.get(url, []):
+            dt_utc = datetime.fromtimestamp(ts, tz=timezone.utc)
+            if dt_utc < cutoff:
+                continue
+            s = score_item(title, link_norm, dt_utc)
+            items.append((s, dt_utc, title, link_norm, desc))
 
     # score + recencia
     items.sort(key=lambda x: (x[0], x[1]), reverse=True)
@@ -345,33 +615,170 @@ def fetch_items():
     seen_url = set()
     uniq = []
     for s, dt_utc, title, link, desc in items:
-        dom = urlparse(link).netloc.lower().replace("www.", "")
-        key = (title.lower(), dom)
+        key = (title.lower(), domain_of(link))
         if key in seen_title_dom or link in seen_url:
             continue
         seen_title_dom.add(key)
         seen_url.add(link)
         uniq.append((s, dt_utc, title, link, desc))
 
-    return uniq
+    return _collapse_near_duplicates(uniq)
+
+# ========= Near-duplicates (MinHash + LSH) =========
+# La misma noticia en CNBC / Reuters / WSJ llega con titulares casi iguales.
+# Se agrupan por similitud de Jaccard sobre los tokens del título: MinHash
+# para la firma, LSH por bandas para encontrar candidatos sin comparar todos
+# contra todos, y verificación exacta del Jaccard antes de agrupar.
+_STOPWORDS = frozenset(
+    "a an the of to in on for and or as at by with from is are be its it this that after "
+    "amid over into up down says said new vs".split()
+)
+_TOKEN_RE   = re.compile(r"[a-z0-9áéíóúñü&$%]+")
+_MH_PRIME   = (1 << 61) - 1
+_MH_RNG     = random.Random(20240501)       # semilla fija: firmas estables entre ejecuciones
+_MH_PERMS   = [(_MH_RNG.randrange(1, _MH_PRIME), _MH_RNG.randrange(0, _MH_PRIME))
+               for _ in range(DUP_BANDS * DUP_ROWS)]
+
+def _title_tokens(title: str) -> frozenset:
+    return frozenset(w for w in _TOKEN_RE.findall((title or "").lower())
+                     if len(w) > 1 and w not in _STOPWORDS)
+
+def _minhash(tokens) -> tuple:
+    hs = [zlib.crc32(w.encode("utf-8")) for w in tokens]
+    return tuple(min((a * h + b) % _MH_PRIME for h in hs) for a, b in _MH_PERMS)
+
+def _collapse_near_duplicates(uniq):
+    """
+    Agrupa titulares casi idénticos (Jaccard >= DUP_THRESHOLD). La lista viene
+    ordenada por score, así que el primero de cada grupo es su representante:
+    cada titular se compara solo con representantes (candidatos vía LSH) y,
+    si no encaja en ninguno, abre grupo. El representante suma
+    DUP_CLUSTER_BONUS por cada fuente (dominio) distinta adicional del grupo:
+    varias copias sindicadas del mismo medio no cuentan como confirmación.
+    """
+    if len(uniq) < 2:
+        return uniq
+
+    leader_of = list(range(len(uniq)))
+    tokens = {}                                # solo de representantes
+    buckets = {}                               # (banda, hashes) → [representantes]
+    for i, x in enumerate(uniq):
+        toks = _title_tokens(x[2])
+        if len(toks) < 3:                      # demasiado corto para comparar con fiabilidad
+            continue
+        sig = _minhash(toks)
+        keys = [(b, sig[b * DUP_ROWS:(b + 1) * DUP_ROWS]) for b in range(DUP_BANDS)]
+
+        candidates = sorted({r for k in keys for r in buckets.get(k, ())})
+        for r in candidates:
+            inter = len(toks & tokens[r])
+            if inter / (len(toks) + len(tokens[r]) - inter) >= DUP_THRESHOLD:
+                leader_of[i] = r
+                break
+        else:
+            tokens[i] = toks
+            for k in keys:
+                buckets.setdefault(k, []).append(i)
+
+    sources = {}
+    for i, r in enumerate(leader_of):
+        sources.setdefault(r, set()).add(domain_of(uniq[i][3]))
+
+    out = []
+    for i, (s, dt_utc, title, link, desc) in enumerate(uniq):
+        if leader_of[i] == i:
+            out.append((s + DUP_CLUSTER_BONUS * (len(sources[i]) - 1), dt_utc, title, link, desc))
+    out.sort(key=lambda x: (x[0], x[1]), reverse=True)
+
+    if len(out) < len(uniq):
+        print(f"[news] Near-duplicates: {len(uniq)} titulares → {len(out)} historias.")
+    return out
+
+# ========= Índice de enviados =========
+# URLs y huellas de título ya publicadas, con caducidad (SENT_TTL_HOURS):
+# las ejecuciones de 13:30 y 21:30 se solapan y no deben repetir historias
+# ni pagar otra vez su traducción.
+def _load_sent_index():
+    try:
+        with open(SENT_INDEX_FILE, "r", encoding="utf-8") as f:
+            d = json.load(f)
+    except Exception:
+        d = {}
+    cutoff = time.time() - SENT_TTL_HOURS * 3600
+    return {
+        "urls":   {u: ts for u, ts in (d.get("urls") or {}).items() if ts >= cutoff},
+        "titles": {fp: e for fp, e in (d.get("titles") or {}).items() if e.get("ts", 0) >= cutoff},
+    }
+
+def _title_fingerprint(tokens):
+    """Huella del título, o None si no tiene tokens (solo emoji, cifras o stopwords):
+    una huella vacía común haría que el primero enviado bloquease a todos los demás."""
+    if not tokens:
+        return None
+    return "%08x" % zlib.crc32(" ".join(sorted(tokens)).encode("utf-8"))
+
+def _filter_already_sent(uniq):
+    """Descarta items cuya URL, huella de título o casi-duplicado ya se envió."""
+    idx = _load_sent_index()
+    if not idx["urls"] and not idx["titles"]:
+        return uniq
+    sent_tokens = [frozenset(e.get("tokens") or ()) for e in idx["titles"].values()]
+
+    out = []
+    for x in uniq:
+        if x[3] in idx["urls"]:
+            continue
+        toks = _title_tokens(x[2])
+        fp = _title_fingerprint(toks)
+        if fp is not None and fp in idx["titles"]:
+            continue
+        if len(toks) >= 3 and any(
+            len(toks & st) / len(toks | st) >= DUP_THRESHOLD for st in sent_tokens if st
+        ):
+            continue
+        out.append(x)
+
+    if len(out) < len(uniq):
+        print(f"[news] {len(uniq) - len(out)} titulares ya enviados en las últimas {SENT_TTL_HOURS:.0f}h.")
+    return out
+
+def _mark_news_sent(items):
+    idx = _load_sent_index()
+    now = time.time()
+    for x in items:
+        toks = _title_tokens(x[2])
+        idx["urls"][x[3]] = now
+        fp = _title_fingerprint(toks)
+        if fp is not None:
+            idx["titles"][fp] = {"ts": now, "tokens": sorted(toks)}
+    try:
+        with open(SENT_INDEX_FILE, "w", encoding="utf-8") as f:
+            json.dump(idx, f, ensure_ascii=False)
+    except Exception:
+        pass
 
 # ========= Selección: última hora + mix =========
 def select_items(uniq):
+    """
+    Selección O(n): una pasada clasifica cada item (por índice) en última hora
+    o en su bucket; después las cuotas se rellenan con un cursor por bucket.
+    Los buckets son disjuntos y ya vienen ordenados por score, así que no hace
+    falta comprobar pertenencia a `selected` ni comparar tuplas.
+    """
     if not uniq:
         return []
 
-    last_hour = [x for x in uniq if is_last_hour(x[2])]
-    rest = [x for x in uniq if x not in last_hour]
-
-    selected = []
+    last_hour = []
+    buckets = {"macro": [], "earnings": [], "deals": [], "company": [], "politics": [], "other": []}
+    for i, x in enumerate(uniq):
+        if is_last_hour(x[2]):
+            last_hour.append(i)
+        else:
+            buckets[classify_item(x[2])].append(i)
+    cursor = dict.fromkeys(buckets, 0)
 
     # 1) Última hora (máx 2)
-    selected += last_hour[:2]
-
-    # 2) Clasificación para mix (sin forzar)
-    buckets = {"macro": [], "earnings": [], "deals": [], "company": [], "politics": [], "other": []}
-    for x in rest:
-        buckets[classify_item(x[2])].append(x)
+    selected = last_hour[:2]
 
     # Cuotas objetivo (no rígidas)
     # Queremos típicamente: macro 1–2, empresas/earnings 2–3, deals 0–1, política 0–1
@@ -379,15 +786,10 @@ def select_items(uniq):
     need = max(0, target_total - len(selected))
 
     def take(bucket_name, n):
-        nonlocal selected
-        out = []
-        for it in buckets[bucket_name]:
-            if it in selected:
-                continue
-            out.append(it)
-            if len(out) >= n:
-                break
-        selected += out
+        start = cursor[bucket_name]
+        out = buckets[bucket_name][start:start + n]
+        cursor[bucket_name] = start + len(out)
+        selected.extend(out)
 
     # Prioridad de relleno
     # Primero aseguramos algo corporativo y macro si existe
@@ -403,20 +805,20 @@ def select_items(uniq):
         take("politics", 1)
 
     # Completa con lo mejor restante (sin forzar)
-    if len(selected) < target_total:
-        pool = []
-        for k in ("macro", "earnings", "company", "deals", "politics", "other"):
-            pool += [x for x in buckets[k] if x not in selected]
-        selected += pool[: max(0, target_total - len(selected))]
+    for k in ("macro", "earnings", "company", "deals", "politics", "other"):
+        if len(selected) >= target_total:
+            break
+        take(k, target_total - len(selected))
 
     # Si aun así queda corto, es que no hay material -> aceptamos menos (no rellenamos)
-    return selected[:target_total]
+    return [uniq[i] for i in selected[:target_total]]
 
 # ========= Telegram =========
 def send_message(text: str):
     url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
-    r = SESSION.post(
+    r = http_client.post(
         url,
+        headers=HTTP_HEADERS,
         data={
             "chat_id": CHAT_ID,
             "parse_mode": "HTML",
@@ -478,8 +880,9 @@ def run_news_once(force: bool = False):
         print(f"{now_local} | NEWS | Ejecutado por main.py (sin validación de ventana en news_es.py).")
     else:
         print(f"{now_local} | NEWS | Envío forzado (force=True).")
+    _TRANSLATIONS.reset_stats()
 
-    uniq = fetch_items()
+    uniq = _filter_already_sent(fetch_items())
     selected = select_items(uniq)
 
     header = f"🗞️ <b>Noticias clave — {fecha_es(now_local)}</b>\n\n"
@@ -489,15 +892,21 @@ def run_news_once(force: bool = False):
         return
 
     # Traducción + preparación
+    # Todos los títulos y descripciones en un único lote
+    texts = [x[2] for x in selected] + [x[4] for x in selected]
+    translated = translate_many(texts)
+    n = len(selected)
+
     prepared = []
-    for s, dt_utc, title, link, desc in selected:
-        title_es = translate_to_es(title) or title
-        desc_es  = translate_to_es(desc) if desc else ""
+    for i, (s, dt_utc, title, link, desc) in enumerate(selected):
+        title_es = translated[i] or title
+        desc_es  = translated[n + i] if desc else ""
         ts_local = dt_utc.astimezone(LOCAL_TZ)
         fuente   = source_label(link)
         cat      = classify_item(title)
         lh       = is_last_hour(title)
         prepared.append((s, dt_utc, title_es, link, desc_es, ts_local, fuente, cat, lh))
+    print(f"[news] Traducciones: {_TRANSLATIONS.stats()}")
 
     # Secciones
     last_hour_items = [x for x in prepared if x[8] is True]
@@ -559,6 +968,7 @@ def run_news_once(force: bool = False):
         text = "\n".join(out).strip()
 
     send_message(text)
+    _mark_news_sent(selected)
     print(f"{now_local} | NEWS | Mensaje de noticias enviado correctamente.")
 
 def main(force: bool = False):
@@ -2,9 +2,10 @@
 import os
 import json
 import datetime as dt
-import requests
+import pandas as pd
 import yfinance as yf
 
+import http_client
 from utils import call_gpt_mini  # unificamos OpenAI
 
 # ================================
@@ -93,7 +94,7 @@ def send_telegram(text: str):
             "disable_web_page_preview": True,
         }
         try:
-            r = requests.post(url, data=payload, timeout=20)
+            r = http_client.post(url, data=payload, timeout=20)
             if r.status_code >= 400:
                 print(f"[WARN] Error Telegram HTTP {r.status_code} (chunk {idx}/{len(chunks)}): {r.text}")
         except Exception as e:
@@ -103,17 +104,83 @@ def send_telegram(text: str):
 # ================================
 # UTILIDADES YFINANCE
 # ================================
-def _get_last_price(t: yf.Ticker) -> float:
+def _batch_history(symbols, **kwargs) -> dict:
     """
-    Último precio intradía (incluye pre/post si existe).
-    Fallback: 5m si 1m está vacío.
+    Descarga multi-símbolo con yf.download (una sola llamada) y la separa
+    en un DataFrame por ticker. Los símbolos sin datos no aparecen.
     """
-    intraday = t.history(period="1d", interval="1m", prepost=True)
-    if intraday is None or intraday.empty:
-        intraday = t.history(period="1d", interval="5m", prepost=True)
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return {}
+
+    try:
+        df = yf.download(
+            tickers=symbols,
+            group_by="ticker",
+            auto_adjust=True,   # igual que Ticker.history()
+            threads=True,
+            progress=False,
+            **kwargs,
+        )
+    except Exception as e:
+        print(f"[WARN] Error descarga batch ({kwargs.get('interval')}): {e}")
+        return {}
+
+    if df is None or df.empty:
+        return {}
+
+    frames = {}
+    multi = isinstance(df.columns, pd.MultiIndex)
+    level0 = set(df.columns.get_level_values(0)) if multi else set()
+    for sym in symbols:
+        if multi:
+            if sym not in level0:
+                continue
+            sub = df[sym]
+        elif len(symbols) == 1:
+            sub = df
+        else:
+            continue
+        sub = sub.dropna(how="all")
+        if not sub.empty and "Close" in sub.columns:
+            frames[sym] = sub
+    return frames
+
+
+def fetch_quote_book(symbols) -> dict:
+    """
+    Motor de cotizaciones por lotes:
+      1. daily 10d para todos los símbolos (incluidos los fallbacks)
+      2. intradía 1m (prepost) para los que tienen daily
+      3. intradía 5m solo para los que vuelven vacíos en 1m
+
+    Devuelve {"daily": {sym: df}, "intraday": {sym: df}}.
+    """
+    symbols = list(dict.fromkeys(symbols))
+
+    daily = _batch_history(symbols, period="10d", interval="1d", prepost=False)
 
+    with_daily = [s for s in symbols if s in daily]
+    intraday = _batch_history(with_daily, period="1d", interval="1m", prepost=True)
+
+    missing = [s for s in with_daily if s not in intraday]
+    if missing:
+        intraday.update(_batch_history(missing, period="1d", interval="5m", prepost=True))
+
+    print(f"[INFO] Quote book: {len(daily)}/{len(symbols)} daily, {len(intraday)} intradía.")
+    return {"daily": daily, "intraday": intraday}
+
+
+def _candidates(yf_tickers) -> list:
+    return [yf_tickers] if isinstance(yf_tickers, str) else list(yf_tickers)
+
+
+def _get_last_price(intraday) -> float:
+    """Último precio intradía (incluye pre/post si existe)."""
     if intraday is not None and not intraday.empty:
-        return float(intraday["Close"].iloc[-1])
+        closes = intraday["Close"].dropna()
+        if not closes.empty:
+            return float(closes.iloc[-1])
 
     return float("nan")
 
@@ -146,9 +213,11 @@ def _compute_close(daily, is_crypto: bool) -> float:
 # ================================
 # CÁLCULO PREMARKET (con fallback de tickers)
 # ================================
-def _get_premarket_data(ticker_map: dict, is_crypto: bool = False):
+def _get_premarket_data(ticker_map: dict, is_crypto: bool = False, book: dict = None):
     """
     ticker_map: { nombre_mostrar: ticker OR [ticker1, ticker2, ticker3...] }
+    book: resultado de fetch_quote_book(); si no se pasa, se descarga aquí
+          en lote para todos los candidatos del ticker_map.
 
     Devuelve lista de dicts:
       {
@@ -160,19 +229,19 @@ def _get_premarket_data(ticker_map: dict, is_crypto: bool = False):
 
     Fallback de tickers: usa el primer ticker que devuelva datos válidos.
     """
+    if book is None:
+        book = fetch_quote_book(
+            s for yf_tickers in ticker_map.values() for s in _candidates(yf_tickers)
+        )
+
     results = []
 
     for name, yf_tickers in ticker_map.items():
-        if isinstance(yf_tickers, str):
-            yf_tickers = [yf_tickers]
-
         best = None
 
-        for yf_ticker in yf_tickers:
+        for yf_ticker in _candidates(yf_tickers):
             try:
-                t = yf.Ticker(yf_ticker)
-
-                daily = t.history(period="10d", interval="1d", prepost=False)
+                daily = book["daily"].get(yf_ticker)
                 if daily is None or daily.empty:
                     continue
 
@@ -180,7 +249,7 @@ def _get_premarket_data(ticker_map: dict, is_crypto: bool = False):
                 if last_close != last_close or last_close == 0:  # NaN o 0
                     continue
 
-                last_price = _get_last_price(t)
+                last_price = _get_last_price(book["intraday"].get(yf_ticker))
                 if last_price != last_price:  # NaN
                     last_price = last_close
 
@@ -204,22 +273,29 @@ def _get_premarket_data(ticker_map: dict, is_crypto: bool = False):
     return results
 
 
-def get_crypto_changes():
-    cryptos = {
-        "BTC": "BTC-USD",
-        "ETH": "ETH-USD",
-    }
-    return _get_premarket_data(cryptos, is_crypto=True)
+CRYPTO_MAP = {
+    "BTC": "BTC-USD",
+    "ETH": "ETH-USD",
+}
+
+
+def get_crypto_changes(book: dict = None):
+    return _get_premarket_data(CRYPTO_MAP, is_crypto=True, book=book)
 
 
 # ================================
 # SENTIMIENTO: VIX + FEAR & GREED
 # ================================
-def _fetch_vix():
-    """Último cierre del VIX y variación vs día anterior."""
+def _fetch_vix(book: dict = None):
+    """
+    Último cierre del VIX y variación vs día anterior.
+    Si se pasa el quote book, reutiliza su daily en vez de otra llamada.
+    """
     try:
-        t = yf.Ticker("^VIX")
-        daily = t.history(period="5d", interval="1d")
+        if book is not None and "^VIX" in book["daily"]:
+            daily = book["daily"]["^VIX"]
+        else:
+            daily = yf.Ticker("^VIX").history(period="5d", interval="1d")
         if daily is None or daily.empty:
             return None
         closes = daily["Close"].dropna()
@@ -251,7 +327,7 @@ def _fetch_fear_and_greed():
         "Referer": "https://edition.cnn.com/",
     }
     try:
-        resp = requests.get(_FG_API_URL, headers=headers, timeout=10)
+        resp = http_client.get(_FG_API_URL, headers=headers, timeout=10)
         resp.raise_for_status()
         data = resp.json()
         fg = data.get("fear_and_greed") or {}
@@ -483,7 +559,6 @@ def run_premarket_morning(force: bool = False):
         # opcional:
         # "Dow": ["YM=F", "DIA", "^DJI"],
     }
-    indices = _get_premarket_data(indices_map, is_crypto=False)
 
     # Mega-caps USA
     mega_map = {
@@ -495,7 +570,6 @@ def run_premarket_morning(force: bool = False):
         "TSLA": "TSLA",
         "GOOGL": "GOOGL",
     }
-    megacaps = _get_premarket_data(mega_map, is_crypto=False)
 
     # Otros sectores clave
     sectors_map = {
@@ -504,9 +578,21 @@ def run_premarket_morning(force: bool = False):
         "MCD": "MCD",
         "UNH": "UNH",
     }
-    sectors = _get_premarket_data(sectors_map, is_crypto=False)
 
-    cryptos = get_crypto_changes()
+    # Una sola pasada de descargas multi-símbolo para todos los bloques
+    # (incluye todos los fallbacks y el VIX); luego se elige en memoria.
+    all_symbols = [
+        s
+        for m in (indices_map, mega_map, sectors_map, CRYPTO_MAP)
+        for yf_tickers in m.values()
+        for s in _candidates(yf_tickers)
+    ] + ["^VIX"]
+    book = fetch_quote_book(all_symbols)
+
+    indices = _get_premarket_data(indices_map, is_crypto=False, book=book)
+    megacaps = _get_premarket_data(mega_map, is_crypto=False, book=book)
+    sectors = _get_premarket_data(sectors_map, is_crypto=False, book=book)
+    cryptos = get_crypto_changes(book=book)
 
     if not (indices or megacaps or sectors or cryptos):
         send_telegram("🌅 <b>Buenos días</b>\n\nNo se ha podido obtener el premarket hoy.")
@@ -515,7 +601,7 @@ def run_premarket_morning(force: bool = False):
     display_text, plain_text = format_premarket_lines(indices, megacaps, sectors, cryptos)
 
     # Sentimiento: VIX + Fear & Greed
-    vix = _fetch_vix()
+    vix = _fetch_vix(book=book)
     fg = _fetch_fear_and_greed()
     sentiment_display, sentiment_plain = _format_sentiment_block(vix, fg)
 
@@ -0,0 +1,111 @@
+# === scan_windows.py ===
+# InvestX — Planificador de ventanas de búsqueda para los scanners diarios
+# (insider_trading, congressional_trades, large_investors)
+# - High-water mark por scanner: último día de filing ya cubierto con éxito
+# - Ventana exacta = (hwm, date_to]: sin huecos tras festivos y sin re-escanear
+# - Sin estado (o force): N sesiones NYSE hacia atrás usando la tabla O(1)
+#   de us_market_calendar, en lugar de "3 si es lunes"
+# - El hwm avanza tras cualquier scan completado (aunque no haya filas); solo
+#   un fallo de descarga (el fetcher devuelve None) lo deja donde estaba
+# - Solape mínimo opcional (min_lookback_days) para fuentes que publican tarde
+
+from __future__ import annotations
+
+import json
+import os
+from datetime import date, datetime, timedelta
+from typing import Dict, Tuple
+
+import us_market_calendar
+
+STATE_FILE       = "scan_windows_state.json"
+MAX_WINDOW_DAYS  = int(os.getenv("SCAN_MAX_WINDOW_DAYS", "10"))   # tope si el hwm es muy antiguo
+
+
+def _load_state() -> Dict:
+    try:
+        with open(STATE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def _save_state(d: Dict) -> None:
+    try:
+        with open(STATE_FILE, "w", encoding="utf-8") as f:
+            json.dump(d, f, indent=2)
+    except Exception:
+        pass
+
+
+def _last_session_on_or_before(d: date) -> date:
+    try:
+        if us_market_calendar.is_trading_day(d):
+            return d
+        return us_market_calendar.previous_trading_day(d)
+    except Exception:
+        while d.weekday() >= 5:
+            d -= timedelta(days=1)
+        return d
+
+
+def _previous_session(d: date) -> date:
+    try:
+        return us_market_calendar.previous_trading_day(d)
+    except Exception:
+        d -= timedelta(days=1)
+        while d.weekday() >= 5:
+            d -= timedelta(days=1)
+        return d
+
+
+def default_window(date_to: date, sessions: int) -> date:
+    """Inicio de la ventana que cubre las últimas `sessions` sesiones hasta date_to."""
+    start = _last_session_on_or_before(date_to)
+    for _ in range(max(0, sessions - 1)):
+        start = _previous_session(start)
+    return start
+
+
+def plan_window(scanner: str, today: date, sessions: int,
+                include_today: bool, force: bool = False,
+                min_lookback_days: int = 0) -> Tuple[date, date]:
+    """
+    (date_from, date_to) de filing a consultar.
+    include_today=False → date_to = ayer (día ya cerrado); True → hoy.
+    min_lookback_days: solape mínimo hacia atrás desde date_to, para fuentes
+    que publican con retraso filas de días ya cubiertos (el anti-dup del
+    scanner descarta las repetidas).
+    """
+    date_to = today if include_today else today - timedelta(days=1)
+    fallback = default_window(date_to, sessions)
+    overlap = date_to - timedelta(days=min_lookback_days) if min_lookback_days else date_to
+
+    hwm_raw = (_load_state().get(scanner) or {}).get("hwm")
+    if force or not hwm_raw:
+        return min(fallback, overlap), date_to
+
+    date_from = date.fromisoformat(hwm_raw) + timedelta(days=1)
+    if date_from > date_to:
+        # Ya cubierto: re-ejecución del mismo día → ventana por defecto
+        return min(fallback, overlap), date_to
+    oldest = date_to - timedelta(days=MAX_WINDOW_DAYS)
+    if date_from < oldest:
+        print(f"[scan] {scanner}: último día cubierto {hwm_raw}; ventana limitada a "
+              f"{MAX_WINDOW_DAYS} días, se omiten {date_from}–{oldest - timedelta(days=1)}.")
+        date_from = oldest
+    return min(date_from, overlap), date_to
+
+
+def commit_window(scanner: str, date_to: date, today: date) -> None:
+    """
+    Marca como cubierto hasta date_to. Si la ventana incluía hoy (día aún
+    abierto), el hwm se queda en ayer para volver a mirar hoy en la próxima.
+    """
+    covered = min(date_to, today - timedelta(days=1))
+    st = _load_state()
+    prev = (st.get(scanner) or {}).get("hwm")
+    if prev and date.fromisoformat(prev) >= covered:
+        return
+    st[scanner] = {"hwm": covered.isoformat(), "updated_at": datetime.now().isoformat(timespec="seconds")}
+    _save_state(st)
@@ -0,0 +1,161 @@
+# === sec_cik_index.py ===
+# InvestX — Índice CIK / ticker / nombre (SEC company_tickers.json)
+# - Una sola descarga compartida por insider_trading y large_investors
+# - Caché en disco con TTL (SEC_CIK_CACHE_TTL_HOURS, default 24h)
+# - Al caducar: GET condicional (If-None-Match / If-Modified-Since) → 304 = sin descarga
+# - Si la SEC falla, se usa la caché aunque esté caducada
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+import http_client
+
+CACHE_FILE   = "sec_company_tickers_cache.json"
+CACHE_TTL    = float(os.getenv("SEC_CIK_CACHE_TTL_HOURS", "24")) * 3600
+HTTP_TIMEOUT = 20
+
+_URL = "https://www.sec.gov/files/company_tickers.json"
+_SEC_HEADERS = {
+    "User-Agent": "InvestX-Bot/1.0 bot@investx.io",
+    "Accept-Encoding": "gzip, deflate",
+}
+
+# Estructura compacta en memoria:
+#   _BY_CIK:    cik (int) → (ticker principal, nombre)
+#   _BY_TICKER: ticker    → cik (int)
+_BY_CIK:    Dict[int, Tuple[str, str]] = {}
+_BY_TICKER: Dict[str, int] = {}
+_LOCK = threading.Lock()
+
+
+# ---------------------------------------------------------------------------
+# Caché en disco
+# ---------------------------------------------------------------------------
+def _load_cache() -> Dict:
+    try:
+        with open(CACHE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def _save_cache(d: Dict) -> None:
+    try:
+        with open(CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump(d, f, separators=(",", ":"))
+    except Exception:
+        pass
+
+
+def _rows_from_sec(data: Dict) -> List[list]:
+    """company_tickers.json → [[cik, ticker, nombre], ...] en el orden de la SEC."""
+    rows = []
+    for item in data.values():
+        ticker = (item.get("ticker") or "").strip().upper()
+        try:
+            cik = int(item.get("cik_str"))
+        except (TypeError, ValueError):
+            continue
+        if ticker:
+            rows.append([cik, ticker, (item.get("title") or "").strip()])
+    return rows
+
+
+def _index_rows(rows: List[list]) -> None:
+    _BY_CIK.clear()
+    _BY_TICKER.clear()
+    for cik, ticker, name in rows:
+        _BY_TICKER.setdefault(ticker, cik)
+        # La SEC lista primero el ticker principal (GOOGL antes que GOOG)
+        _BY_CIK.setdefault(cik, (ticker, name))
+
+
+def _fetch(cache: Dict) -> Optional[Dict]:
+    """GET condicional. Devuelve la caché actualizada o None si falla."""
+    headers = dict(_SEC_HEADERS)
+    if cache.get("rows"):
+        if cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+        if cache.get("last_modified"):
+            headers["If-Modified-Since"] = cache["last_modified"]
+
+    try:
+        resp = http_client.get(_URL, headers=headers, timeout=HTTP_TIMEOUT)
+        if resp.status_code == 304:
+            print("[cik_index] company_tickers.json sin cambios (304).")
+            return dict(cache, fetched_at=time.time())
+        resp.raise_for_status()
+        rows = _rows_from_sec(resp.json())
+    except Exception as e:
+        print(f"[cik_index] Error descargando company_tickers.json: {e}")
+        return None
+
+    print(f"[cik_index] company_tickers.json descargado ({len(rows)} entradas).")
+    return {
+        "etag":          resp.headers.get("ETag", ""),
+        "last_modified": resp.headers.get("Last-Modified", ""),
+        "fetched_at":    time.time(),
+        "rows":          rows,
+    }
+
+
+def load_index(force_refresh: bool = False) -> bool:
+    """
+    Carga el índice en memoria (una vez por proceso).
+    Orden: memoria → disco fresco → GET condicional → disco caducado.
+    Devuelve True si hay datos disponibles.
+    """
+    with _LOCK:
+        if _BY_CIK and not force_refresh:
+            return True
+
+        cache = _load_cache()
+        fresh = (time.time() - float(cache.get("fetched_at") or 0)) < CACHE_TTL
+        if cache.get("rows") and fresh and not force_refresh:
+            _index_rows(cache["rows"])
+            return True
+
+        updated = _fetch(cache)
+        if updated and updated.get("rows"):
+            _save_cache(updated)
+            cache = updated
+        elif cache.get("rows"):
+            print("[cik_index] Usando caché caducada de company_tickers.json.")
+
+        if cache.get("rows"):
+            _index_rows(cache["rows"])
+        return bool(_BY_CIK)
+
+
+# ---------------------------------------------------------------------------
+# Consultas
+# ---------------------------------------------------------------------------
+def _cik_int(cik: Union[str, int]) -> Optional[int]:
+    try:
+        return int(cik)
+    except (TypeError, ValueError):
+        return None
+
+
+def ticker_to_cik(ticker: str) -> Optional[str]:
+    """Ticker → CIK con ceros a la izquierda (10 dígitos, formato submissions API)."""
+    load_index()
+    cik = _BY_TICKER.get((ticker or "").strip().upper())
+    return str(cik).zfill(10) if cik is not None else None
+
+
+def cik_to_ticker(cik: Union[str, int]) -> Optional[str]:
+    load_index()
+    entry = _BY_CIK.get(_cik_int(cik))
+    return entry[0] if entry else None
+
+
+def cik_to_name(cik: Union[str, int]) -> Optional[str]:
+    load_index()
+    entry = _BY_CIK.get(_cik_int(cik))
+    return entry[1] if entry else None
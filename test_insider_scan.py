@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# === test_insider_scan.py ===
+# Pruebas del scan incremental de insider_trading sin tocar la SEC: CIK map,
+# submissions y XMLs se sustituyen por datos fijos.
+# - Un XML fallido no tumba el scan: se devuelven las operaciones del resto
+# - El cursor del CIK se queda justo antes del filing fallido y el hwm de la
+#   ventana no pasa del día anterior a ese filing
+#
+# Uso:
+#   cd /ruta/a/investx-scheduler
+#   python -m pytest -q test_insider_scan.py
+
+import json
+from datetime import date
+
+import insider_trading
+import scan_windows
+
+CIKS = {"AAA": "0000000001", "BBB": "0000000002"}
+
+# Del más reciente al más antiguo, como los devuelve _get_form4_filings
+FILINGS = {
+    "0000000001": [
+        {"accession": "a-3", "primary_doc": "a3.xml", "filing_date": date(2025, 10, 9)},
+        {"accession": "a-2", "primary_doc": "a2.xml", "filing_date": date(2025, 10, 8)},
+        {"accession": "a-1", "primary_doc": "a1.xml", "filing_date": date(2025, 10, 7)},
+    ],
+    "0000000002": [
+        {"accession": "b-1", "primary_doc": "b1.xml", "filing_date": date(2025, 10, 8)},
+    ],
+}
+
+BROKEN = {"a-2"}
+
+
+def _trade(filing):
+    return {
+        "ticker": "T", "issuer_name": "Issuer", "owner_name": filing["accession"],
+        "role": "CEO", "code": "P", "shares": 1000.0, "price": 1000.0,
+        "value": 1_000_000.0, "date": filing["filing_date"],
+    }
+
+
+def _scan(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(insider_trading, "_build_cik_map", lambda: dict(CIKS))
+    monkeypatch.setattr(insider_trading, "_ciks_with_form4", lambda d_from, d_to: None)
+    monkeypatch.setattr(insider_trading, "_get_form4_filings",
+                        lambda cik, d_from, d_to, cursor=None: FILINGS[cik] and list(FILINGS[cik]))
+    monkeypatch.setattr(insider_trading, "_parse_form4_xml",
+                        lambda cik, f: None if f["accession"] in BROKEN else [_trade(f)])
+    monkeypatch.setattr(insider_trading, "_save_xml_cache", lambda: None)
+    return insider_trading.fetch_insider_trades(date(2025, 10, 7), date(2025, 10, 9))
+
+
+def test_failed_xml_keeps_other_trades(monkeypatch, tmp_path):
+    trades = _scan(monkeypatch, tmp_path)
+    assert trades is not None
+    assert sorted(t["owner_name"] for t in trades) == ["a-1", "a-3", "b-1"]
+
+
+def test_cursor_and_window_after_partial_failure(monkeypatch, tmp_path):
+    _scan(monkeypatch, tmp_path)
+    insider_trading._commit_scan(date(2025, 10, 9), today=date(2025, 10, 10))
+
+    with open(insider_trading.CURSOR_FILE, encoding="utf-8") as f:
+        cursors = json.load(f)
+    # AAA: parado en a-1 para que la próxima ejecución reintente a-2 (y relea a-3 de caché)
+    assert cursors["0000000001"] == {"acc": "a-1", "date": "2025-10-07"}
+    assert cursors["0000000002"] == {"acc": "b-1", "date": "2025-10-08"}
+
+    with open(scan_windows.STATE_FILE, encoding="utf-8") as f:
+        assert json.load(f)["insider"]["hwm"] == "2025-10-07"
+
+
+def test_failed_submissions_keeps_cursor_and_window(monkeypatch, tmp_path):
+    monkeypatch.setitem(FILINGS, "0000000002", None)
+    trades = _scan(monkeypatch, tmp_path)
+    assert sorted(t["owner_name"] for t in trades) == ["a-1", "a-3"]
+
+    insider_trading._commit_scan(date(2025, 10, 9), today=date(2025, 10, 10))
+    with open(insider_trading.CURSOR_FILE, encoding="utf-8") as f:
+        assert "0000000002" not in json.load(f)
+    # Sin hwm previo y fallo en submissions: la ventana no avanza más allá de date_from - 1
+    with open(scan_windows.STATE_FILE, encoding="utf-8") as f:
+        assert json.load(f)["insider"]["hwm"] == "2025-10-06"
@@ -0,0 +1,31 @@
+# === trie_regex.py ===
+# InvestX — Alternancias regex con forma de trie
+# - Lista de términos → patrón en el que cada posición casa el término más largo
+# - El coste por posición depende de la longitud del término, no del nº de
+#   términos: miles de nombres en una sola regex compilada
+# - Lo usan news_es (clasificador de titulares) y large_investors (nombres de fondos)
+
+import re
+from typing import Iterable
+
+
+def trie_pattern(terms: Iterable[str]) -> str:
+    """Alternancia en forma de trie; en cada posición casa el término más largo."""
+    trie = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def _build(node) -> str:
+        end = node.get("", False)
+        alts = [re.escape(ch) + _build(child) for ch, child in sorted(node.items()) if ch != ""]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        if end:
+            body = ("(?:" + body + ")?") if len(alts) == 1 else body + "?"
+        return body
+
+    return _build(trie)
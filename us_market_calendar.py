@@ -1,14 +1,205 @@
 # us_market_calendar.py
+# Calendario NYSE precalculado:
+# - Tabla de sesiones (días hábiles + cierres anticipados) para una ventana
+#   móvil de varios años, guardada en disco (NYSE_CALENDAR_FILE)
+# - Se regenera con pandas_market_calendars solo cuando queda poco horizonte
+# - Consultas O(1) sin pandas: is_trading_day, next_trading_day,
+#   previous_trading_day, session_hours
+# - Si no se puede cargar ni regenerar, se usa la regla L-V (09:30–16:00) y
+#   no se reintenta hasta pasadas _RETRY_FAILED_SECS
+import json
 import os
-from datetime import datetime, timedelta, date
+import threading
+import time
+from datetime import datetime, timedelta, date, time as dtime
+from typing import Dict, Optional, Tuple
 from zoneinfo import ZoneInfo
 
-import pandas_market_calendars as mcal
-
 NY_TZ = ZoneInfo("America/New_York")
 MADRID_TZ = ZoneInfo("Europe/Madrid")
 
-NYSE = mcal.get_calendar("NYSE")
+NYSE_CALENDAR_FILE = "nyse_calendar_cache.json"
+_PAST_DAYS    = 400          # ventana: ~1 año hacia atrás
+_FUTURE_DAYS  = 3 * 365      # ... y ~3 años hacia delante
+_MIN_HORIZON  = 180          # regenerar si quedan menos días de futuro
+_RETRY_FAILED_SECS = 6 * 3600   # tras un fallo de regeneración, no reintentar antes
+
+_NYSE = None
+
+# Tablas en memoria (se rellenan en _ensure)
+_SESSIONS: Dict[date, Tuple[str, str]] = {}     # día → ("09:30", "16:00") hora NY
+_NEXT: Dict[date, date] = {}                    # día → siguiente sesión (estrictamente posterior)
+_PREV: Dict[date, date] = {}                    # día → sesión anterior (estrictamente anterior)
+_RANGE: Tuple[Optional[date], Optional[date]] = (None, None)
+_FAILED_AT: Optional[float] = None              # último fallo de regeneración (monotonic)
+_LOCK = threading.Lock()
+
+
+def _nyse():
+    """Calendario NYSE de pandas_market_calendars, creado en el primer uso (import pesado)."""
+    global _NYSE
+    if _NYSE is None:
+        import pandas_market_calendars as mcal
+        _NYSE = mcal.get_calendar("NYSE")
+    return _NYSE
+
+
+# ---------------------------------------------------------------------------
+# Generación y caché en disco
+# ---------------------------------------------------------------------------
+def _generate(start: date, end: date) -> Dict:
+    sched = _nyse().schedule(start_date=start, end_date=end)
+    sessions = {}
+    for _, row in sched.iterrows():
+        op = row["market_open"].tz_convert(NY_TZ)
+        cl = row["market_close"].tz_convert(NY_TZ)
+        sessions[op.date().isoformat()] = [op.strftime("%H:%M"), cl.strftime("%H:%M")]
+    print(f"[nyse] Calendario regenerado {start} → {end} ({len(sessions)} sesiones).")
+    return {"start": start.isoformat(), "end": end.isoformat(),
+            "generated_at": datetime.now(NY_TZ).isoformat(), "sessions": sessions}
+
+
+def _load_file() -> Dict:
+    try:
+        with open(NYSE_CALENDAR_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def _save_file(d: Dict) -> None:
+    try:
+        with open(NYSE_CALENDAR_FILE, "w", encoding="utf-8") as f:
+            json.dump(d, f, separators=(",", ":"))
+    except Exception:
+        pass
+
+
+def _index(d: Dict) -> None:
+    global _RANGE
+    start = date.fromisoformat(d["start"])
+    end   = date.fromisoformat(d["end"])
+    sessions = {date.fromisoformat(k): tuple(v) for k, v in d["sessions"].items()}
+
+    nxt, prv = {}, {}
+    # Pasada hacia atrás: siguiente sesión de cada día natural
+    upcoming = None
+    day = end
+    while day >= start:
+        nxt[day] = upcoming
+        if day in sessions:
+            upcoming = day
+        day -= timedelta(days=1)
+    # Pasada hacia delante: sesión anterior
+    last = None
+    day = start
+    while day <= end:
+        prv[day] = last
+        if day in sessions:
+            last = day
+        day += timedelta(days=1)
+
+    _SESSIONS.clear()
+    _SESSIONS.update(sessions)
+    _NEXT.clear()
+    _NEXT.update({k: v for k, v in nxt.items() if v is not None})
+    _PREV.clear()
+    _PREV.update({k: v for k, v in prv.items() if v is not None})
+    _RANGE = (start, end)
+
+
+def _failed_recently() -> bool:
+    return _FAILED_AT is not None and time.monotonic() - _FAILED_AT < _RETRY_FAILED_SECS
+
+
+def _ensure() -> None:
+    """
+    Carga la tabla (memoria → disco → regeneración si queda poco horizonte).
+    Si la regeneración falla se recuerda el fallo: hasta _RETRY_FAILED_SECS
+    las consultas usan la tabla guardada (aunque tenga poco horizonte) o la
+    regla L-V, sin volver a intentarlo en cada llamada.
+    """
+    global _FAILED_AT
+    today = datetime.now(NY_TZ).date()
+    start, end = _RANGE
+    if (end and (end - today).days >= _MIN_HORIZON) or _failed_recently():
+        return
+
+    with _LOCK:
+        start, end = _RANGE
+        if (end and (end - today).days >= _MIN_HORIZON) or _failed_recently():
+            return
+
+        d = _load_file()
+        fresh = d.get("end") and (date.fromisoformat(d["end"]) - today).days >= _MIN_HORIZON
+        if not fresh:
+            try:
+                d = _generate(today - timedelta(days=_PAST_DAYS), today + timedelta(days=_FUTURE_DAYS))
+                _save_file(d)
+                _FAILED_AT = None
+            except Exception as e:
+                _FAILED_AT = time.monotonic()
+                if not d.get("sessions"):
+                    print(f"[nyse] No se pudo generar el calendario ({e}); usando regla L-V.")
+                    return
+                print(f"[nyse] No se pudo regenerar el calendario ({e}); usando el guardado.")
+        _index(d)
+
+
+def _in_range(d: date) -> bool:
+    start, end = _RANGE
+    return start is not None and start <= d <= end
+
+
+# ---------------------------------------------------------------------------
+# Consultas O(1)
+# ---------------------------------------------------------------------------
+def is_trading_day(d: date) -> bool:
+    _ensure()
+    if not _in_range(d):
+        return d.weekday() < 5          # fuera de ventana: solo regla L-V
+    return d in _SESSIONS
+
+
+def next_trading_day(d: date) -> date:
+    """Siguiente sesión estrictamente posterior a `d`."""
+    _ensure()
+    if _in_range(d) and d in _NEXT:
+        return _NEXT[d]
+    d += timedelta(days=1)
+    while d.weekday() >= 5:
+        d += timedelta(days=1)
+    return d
+
+
+def previous_trading_day(d: date) -> date:
+    """Sesión anterior estrictamente a `d`."""
+    _ensure()
+    if _in_range(d) and d in _PREV:
+        return _PREV[d]
+    d -= timedelta(days=1)
+    while d.weekday() >= 5:
+        d -= timedelta(days=1)
+    return d
+
+
+def session_hours(d: date) -> Optional[Tuple[datetime, datetime]]:
+    """(apertura, cierre) en hora de Nueva York, o None si NYSE no abre."""
+    _ensure()
+    if not _in_range(d):
+        s = ("09:30", "16:00") if d.weekday() < 5 else None   # fuera de tabla: regla L-V
+    else:
+        s = _SESSIONS.get(d)
+    if not s:
+        return None
+    op = datetime.combine(d, dtime.fromisoformat(s[0]), tzinfo=NY_TZ)
+    cl = datetime.combine(d, dtime.fromisoformat(s[1]), tzinfo=NY_TZ)
+    return op, cl
+
+
+def is_early_close(d: date) -> bool:
+    s = _SESSIONS.get(d) if is_trading_day(d) else None
+    return bool(s) and s[1] < "16:00"
 
 
 def is_nyse_trading_day(dt_madrid: datetime) -> bool:
@@ -33,6 +224,5 @@ def is_nyse_trading_day(dt_madrid: datetime) -> bool:
     dt_ny = dt_simulated.replace(tzinfo=MADRID_TZ).astimezone(NY_TZ)
     d: date = dt_ny.date()
 
-    # Consultamos calendario NYSE
-    sched = NYSE.schedule(start_date=d, end_date=d)
-    return not sched.empty
+    # Consultamos la tabla precalculada
+    return is_trading_day(d)
@@ -1,7 +1,6 @@
 import os
 import logging
-import requests
-from openai import OpenAI
+import http_client
 
 logger = logging.getLogger(__name__)
 
@@ -34,7 +33,7 @@ def send_telegram_message(text: str):
             "parse_mode": "Markdown",
             "disable_web_page_preview": True,
         }
-        resp = requests.post(url, json=payload, timeout=10)
+        resp = http_client.post(url, json=payload, timeout=10)
 
         try:
             data = resp.json()
@@ -55,7 +54,16 @@ def send_telegram_message(text: str):
 
 # -------- OPENAI (mini) --------
 _openai_api_key = os.getenv("OPENAI_API_KEY")
-_client = OpenAI(api_key=_openai_api_key) if _openai_api_key else None
+_client = None
+
+
+def _get_client():
+    """Cliente OpenAI creado en la primera llamada (el import de openai es pesado)."""
+    global _client
+    if _client is None and _openai_api_key:
+        from openai import OpenAI
+        _client = OpenAI(api_key=_openai_api_key)
+    return _client
 
 
 def call_gpt_mini(system_prompt: str, user_prompt: str, max_tokens: int = 600) -> str:
@@ -63,12 +71,13 @@ def call_gpt_mini(system_prompt: str, user_prompt: str, max_tokens: int = 600) -
     Llama a un modelo ligero de OpenAI para generar texto breve.
     Si hay cualquier error, devuelve cadena vacía y se loguea.
     """
-    if not _client:
+    client = _get_client()
+    if not client:
         logger.warning("OpenAI: falta OPENAI_API_KEY; no se llama a la IA.")
         return ""
 
     try:
-        resp = _client.responses.create(
+        resp = client.responses.create(
             model="gpt-4.1-mini",  # <- modelo ligero disponible
             input=[
                 {"role": "system", "content": system_prompt},